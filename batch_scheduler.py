@@ -0,0 +1,87 @@
+"""
+Batch Scheduler
+Length-bucketed batching under a token budget for transformer inference
+"""
+
+
+def schedule_batches(lengths, max_tokens=4096, max_batch_size=32):
+    """Group indices into length-sorted batches whose padded size stays within max_tokens"""
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+
+    batches = []
+    current = []
+    current_max = 0
+
+    for i in order:
+        length = lengths[i]
+        padded_max = max(current_max, length)
+
+        # Close the batch once the padded token count or the text count would overflow
+        if current and (padded_max * (len(current) + 1) > max_tokens or len(current) >= max_batch_size):
+            batches.append(current)
+            current = []
+            padded_max = length
+
+        current.append(i)
+        current_max = padded_max
+
+    if current:
+        batches.append(current)
+
+    return batches
+
+
+def padding_stats(lengths, batches, naive_batch_size=32):
+    """Compare padded tokens of a schedule against fixed-size batches in input order"""
+    real_tokens = sum(lengths)
+    padded_tokens = sum(max(lengths[i] for i in batch) * len(batch) for batch in batches)
+
+    naive_padded_tokens = 0
+    for start in range(0, len(lengths), naive_batch_size):
+        chunk = lengths[start:start + naive_batch_size]
+        naive_padded_tokens += max(chunk) * len(chunk)
+
+    saved_tokens = naive_padded_tokens - padded_tokens
+    naive_padding = naive_padded_tokens - real_tokens
+
+    return {
+        'num_texts': len(lengths),
+        'num_batches': len(batches),
+        'real_tokens': real_tokens,
+        'padded_tokens': padded_tokens,
+        'naive_padded_tokens': naive_padded_tokens,
+        'padding_saved_tokens': saved_tokens,
+        'padding_saved_pct': (saved_tokens / naive_padding * 100) if naive_padding else 0.0,
+        'compute_saved_pct': (saved_tokens / naive_padded_tokens * 100) if naive_padded_tokens else 0.0,
+    }
+
+
+def add_padding_stats(total, stats):
+    """Combine two padding_stats results (e.g. across streamed micro-batches)"""
+    if not total:
+        return dict(stats) if stats else total
+    if not stats:
+        return total
+
+    combined = {
+        key: total[key] + stats[key]
+        for key in ('num_texts', 'num_batches', 'real_tokens', 'padded_tokens',
+                    'naive_padded_tokens', 'padding_saved_tokens')
+    }
+    saved_tokens = combined['padding_saved_tokens']
+    naive_padding = combined['naive_padded_tokens'] - combined['real_tokens']
+    combined['padding_saved_pct'] = (saved_tokens / naive_padding * 100) if naive_padding else 0.0
+    combined['compute_saved_pct'] = (
+        saved_tokens / combined['naive_padded_tokens'] * 100 if combined['naive_padded_tokens'] else 0.0
+    )
+    return combined
+
+
+def print_padding_stats(stats):
+    """Print a one-block report of how much padding the scheduler avoided"""
+    print("\n--- Batch Scheduler ---")
+    print(f"Texts: {stats['num_texts']} in {stats['num_batches']} batches")
+    print(f"Real tokens: {stats['real_tokens']} | Padded: {stats['padded_tokens']} "
+          f"(fixed-size batches: {stats['naive_padded_tokens']})")
+    print(f"Padding saved: {stats['padding_saved_tokens']} tokens "
+          f"({stats['padding_saved_pct']:.1f}% of padding, {stats['compute_saved_pct']:.1f}% of compute)")
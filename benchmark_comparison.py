@@ -5,133 +5,106 @@ Provides comprehensive observability and performance metrics
 
 import time
 import torch
-import numpy as np
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-from sentiment_analysis import fetch_news
+from sentiment_analysis import analyze_sentiments
+from sentiment_engines import get_engine
+from news_fetcher import NEWS_CORPUS, NEWS_CORPUS_MODE, fetch_news_many
+from model_registry import get_device
+from stage_metrics import LatencyHistogram
 import psutil
 import json
 from datetime import datetime
 from collections import defaultdict
 
-# GPU setup for FinBERT
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-
-# Load models
+# Load models (shared through the model registry)
 print("Loading models...")
-vader_analyzer = SentimentIntensityAnalyzer()
-
-finbert_model = AutoModelForSequenceClassification.from_pretrained(
-    "yiyanghkust/finbert-tone"
-).to(device)
-finbert_tokenizer = AutoTokenizer.from_pretrained("yiyanghkust/finbert-tone")
-labels = ['Positive', 'Negative', 'Neutral']
+get_engine('vader').warm_up()
+get_engine('finbert').warm_up()
+device = get_device()
 
 print("Models loaded!\n")
 
 
-def analyze_sentiment_vader(text):
-    """VADER sentiment analysis"""
-    scores = vader_analyzer.polarity_scores(text)
-    polarity = scores['compound']
-
-    if polarity > 0.05:
-        sentiment = 'Positive'
-    elif polarity < -0.05:
-        sentiment = 'Negative'
-    else:
-        sentiment = 'Neutral'
-
-    return polarity, sentiment
-
-
-def analyze_sentiment_finbert(text):
-    """FinBERT sentiment analysis"""
-    if not text.strip():
-        return 0.0, 'Neutral'
-
-    inputs = finbert_tokenizer(
-        text,
-        return_tensors="pt",
-        truncation=True,
-        max_length=512
-    ).to(device)
+def analyze_sentiments_vader(texts):
+    """VADER sentiment analysis (uncached, so every run measures the engine)"""
+    return analyze_sentiments(texts, engine='vader', use_cache=False)
 
-    with torch.no_grad():
-        outputs = finbert_model(**inputs)
 
-    logits = outputs.logits
-    probabilities = torch.softmax(logits, dim=1).cpu().numpy()[0]
-    max_index = np.argmax(probabilities)
-    sentiment = labels[max_index]
-    confidence = probabilities[max_index]
-
-    return confidence, sentiment
+def analyze_sentiments_finbert(texts):
+    """Batched FinBERT sentiment analysis (uncached, so every run measures the engine)"""
+    return analyze_sentiments(texts, engine='finbert', use_cache=False)
 
 
 class PerformanceMetrics:
-    """Track performance metrics for each method"""
+    """Track performance metrics for each method (fixed-memory per-batch timing histogram, RSS/VRAM extremes)"""
 
     def __init__(self, name):
         self.name = name
-        self.timings = []
-        self.memory_samples = []
-        self.gpu_memory_samples = []
+        self.timings = LatencyHistogram()
+        self.memory_range = [float('inf'), 0.0]
+        self.gpu_memory_range = [float('inf'), 0.0]
         self.results = []
         self.start_time = None
         self.end_time = None
 
+    def sample_memory(self):
+        """Fold the current RSS (and allocated VRAM) into the observed min/max"""
+        rss = psutil.Process().memory_info().rss / 1e6
+        self.memory_range = [min(self.memory_range[0], rss), max(self.memory_range[1], rss)]
+        if torch.cuda.is_available():
+            allocated = torch.cuda.memory_allocated() / 1e6
+            self.gpu_memory_range = [min(self.gpu_memory_range[0], allocated), max(self.gpu_memory_range[1], allocated)]
+
     def start(self):
         """Start timing"""
-        self.start_time = time.time()
-        self.memory_samples.append(psutil.Process().memory_info().rss / 1e6)
-        if torch.cuda.is_available():
-            self.gpu_memory_samples.append(torch.cuda.memory_allocated() / 1e6)
+        self.start_time = time.perf_counter()
+        self.sample_memory()
 
-    def record_single(self, elapsed, result):
-        """Record single operation"""
-        self.timings.append(elapsed)
-        self.results.append(result)
+    def record_batch(self, elapsed_ns, results):
+        """Record one timed batch and its per-article results"""
+        self.timings.record(elapsed_ns)
+        self.results.extend(results)
 
     def end(self):
         """End timing"""
-        self.end_time = time.time()
-        self.memory_samples.append(psutil.Process().memory_info().rss / 1e6)
-        if torch.cuda.is_available():
-            self.gpu_memory_samples.append(torch.cuda.memory_allocated() / 1e6)
+        self.end_time = time.perf_counter()
+        self.sample_memory()
 
     def get_stats(self):
         """Calculate statistics"""
         total_time = self.end_time - self.start_time
-        timings_array = np.array(self.timings) * 1000  # Convert to ms
+        timings = self.timings.to_dict()
 
         # Sentiment distribution
         sentiment_counts = defaultdict(int)
         for _, sentiment in self.results:
             sentiment_counts[sentiment] += 1
 
+        # Percentiles are over whole batches; the per-article figure is the amortized average
+        num_articles = len(self.results)
         stats = {
             'name': self.name,
             'total_time_sec': total_time,
-            'num_samples': len(self.timings),
-            'avg_time_ms': np.mean(timings_array),
-            'median_time_ms': np.median(timings_array),
-            'min_time_ms': np.min(timings_array),
-            'max_time_ms': np.max(timings_array),
-            'std_time_ms': np.std(timings_array),
-            'throughput_per_sec': len(self.timings) / total_time,
-            'ram_usage_mb': max(self.memory_samples) - min(self.memory_samples),
+            'num_samples': num_articles,
+            'num_batches': timings['count'],
+            'avg_time_ms': timings['total_ms'] / num_articles if num_articles else 0.0,
+            'batch_median_ms': timings['p50_ms'],
+            'batch_p95_ms': self.timings.percentile(95) / 1e6,
+            'batch_p99_ms': timings['p99_ms'],
+            'batch_min_ms': timings['min_ms'],
+            'batch_max_ms': timings['max_ms'],
+            'throughput_per_sec': num_articles / total_time,
+            'ram_usage_mb': self.memory_range[1] - self.memory_range[0],
             'sentiment_distribution': dict(sentiment_counts),
         }
 
-        if torch.cuda.is_available() and self.gpu_memory_samples:
-            stats['gpu_memory_mb'] = max(self.gpu_memory_samples) - min(self.gpu_memory_samples)
+        if torch.cuda.is_available():
+            stats['gpu_memory_mb'] = self.gpu_memory_range[1] - self.gpu_memory_range[0]
 
         return stats
 
 
-def benchmark_method(method_name, analyze_func, articles):
-    """Benchmark a single method"""
+def benchmark_method(method_name, analyze_batch_func, articles, batch_size=32):
+    """Benchmark a single batch-oriented method"""
     print(f"{'='*70}")
     print(f"Benchmarking: {method_name}")
     print(f"{'='*70}")
@@ -139,21 +112,20 @@ def benchmark_method(method_name, analyze_func, articles):
     metrics = PerformanceMetrics(method_name)
     metrics.start()
 
-    for i, article in enumerate(articles):
-        text = article['title']
+    for batch_start in range(0, len(articles), batch_size):
+        texts = [article['title'] for article in articles[batch_start:batch_start + batch_size]]
 
-        # Time individual analysis
-        start = time.time()
-        score, sentiment = analyze_func(text)
-        elapsed = time.time() - start
+        # One latency sample per batch (batches are scored in one call, articles are not timed alone)
+        start = time.perf_counter_ns()
+        batch_results = analyze_batch_func(texts)
+        metrics.record_batch(time.perf_counter_ns() - start, batch_results)
 
-        metrics.record_single(elapsed, (score, sentiment))
+        for i, (text, (score, sentiment)) in enumerate(zip(texts, batch_results), batch_start):
+            # Print first 5
+            if i < 5:
+                print(f"  [{i+1}] {sentiment} ({score:.2f}): {text[:60]}...")
 
-        # Print first 5 and progress
-        if i < 5:
-            print(f"  [{i+1}] {sentiment} ({score:.2f}): {text[:60]}...")
-        elif i % 20 == 0:
-            print(f"  Progress: {i}/{len(articles)} articles analyzed...")
+        print(f"  Progress: {min(batch_start + batch_size, len(articles))}/{len(articles)} articles analyzed...")
 
     metrics.end()
 
@@ -219,9 +191,13 @@ def print_performance_report(vader_stats, finbert_stats):
          f"{finbert_stats['avg_time_ms']:.2f}ms",
          'VADER' if vader_stats['avg_time_ms'] < finbert_stats['avg_time_ms'] else 'FinBERT'),
 
-        ('Median Time', f"{vader_stats['median_time_ms']:.2f}ms",
-         f"{finbert_stats['median_time_ms']:.2f}ms",
-         'VADER' if vader_stats['median_time_ms'] < finbert_stats['median_time_ms'] else 'FinBERT'),
+        ('Median Batch Time', f"{vader_stats['batch_median_ms']:.2f}ms",
+         f"{finbert_stats['batch_median_ms']:.2f}ms",
+         'VADER' if vader_stats['batch_median_ms'] < finbert_stats['batch_median_ms'] else 'FinBERT'),
+
+        ('p99 Batch Time', f"{vader_stats['batch_p99_ms']:.2f}ms",
+         f"{finbert_stats['batch_p99_ms']:.2f}ms",
+         'VADER' if vader_stats['batch_p99_ms'] < finbert_stats['batch_p99_ms'] else 'FinBERT'),
 
         ('Throughput', f"{vader_stats['throughput_per_sec']:.1f}/sec",
          f"{finbert_stats['throughput_per_sec']:.1f}/sec",
@@ -309,23 +285,25 @@ def main():
 
     # Fetch articles
     print("\n📰 Fetching articles...")
+    if NEWS_CORPUS:
+        print(f"   📼 {NEWS_CORPUS_MODE.capitalize()} corpus: {NEWS_CORPUS}/")
     queries = ["gold market", "gold price", "gold forecast"]
     articles = []
 
-    for query in queries:
-        print(f"   Fetching: '{query}'...")
-        articles.extend(fetch_news(query, num_articles=20))
+    print(f"   Fetching: {', '.join(repr(query) for query in queries)}...")
+    for query_articles in fetch_news_many(queries, num_articles=20):
+        articles.extend(query_articles)
 
     print(f"   Total articles fetched: {len(articles)}\n")
 
     # Benchmark VADER
-    vader_metrics = benchmark_method("VADER", analyze_sentiment_vader, articles)
+    vader_metrics = benchmark_method("VADER", analyze_sentiments_vader, articles)
 
     # Small delay
     time.sleep(1)
 
     # Benchmark FinBERT
-    finbert_metrics = benchmark_method("FinBERT (GPU)", analyze_sentiment_finbert, articles)
+    finbert_metrics = benchmark_method(f"FinBERT ({device})", analyze_sentiments_finbert, articles)
 
     # Get statistics
     vader_stats = vader_metrics.get_stats()
@@ -0,0 +1,171 @@
+"""
+HTML Extraction Benchmark
+Pages/sec, MB/sec and peak allocation of each <p> extractor on a saved corpus of article
+pages, with the extracted text checked against the BeautifulSoup path
+"""
+
+import argparse
+import glob
+import gzip
+import os
+import random
+import time
+import tracemalloc
+
+from html_extract import EXTRACTORS, MAX_PAGE_BYTES, extract_paragraphs_bytes, parse_pool
+from replay import INDEX_FILE, ResponseCorpus
+
+DEFAULT_CORPUS = "html_corpus"
+
+_WORDS = ("gold prices rallied as the dollar weakened and traders priced in rate cuts while "
+          "central banks kept buying bullion miners reported record margins analysts said demand "
+          "for safe haven assets could cool if inflation data surprises to the upside").split()
+
+
+def _sentence(rng):
+    words = [rng.choice(_WORDS) for _ in range(rng.randint(8, 30))]
+    return ' '.join(words).capitalize() + '.'
+
+
+def generate_page(rng, paragraphs):
+    """News-like page: scripts, nav, an article with inline markup, unclosed tags and a footer"""
+    body = []
+    for i in range(paragraphs):
+        text = ' '.join(_sentence(rng) for _ in range(rng.randint(1, 4)))
+        if i % 7 == 3:
+            text += f' <a href="/story/{i}">Read more</a> &amp; <em>analysis</em> &#8212; {rng.randint(1, 99)}&nbsp;%'
+        if i % 11 == 5:
+            text += '<script>window.ads && ads.push({"slot": "<p>inline</p>"});</script>'
+        if i % 13 == 7:
+            body.append(f'<div class="related"><p>{text}</div>')  # <p> closed by its parent
+        else:
+            body.append(f'<p class="body-text">{text}</p>')
+        if i % 5 == 0:
+            body.append('<figure><img src="/chart.png"><figcaption>Chart</figcaption></figure>\n')
+
+    scripts = ''.join(
+        f'<script>var config{n} = {{"id": {n}, "html": "<div><p>x</p></div>"}};</script>\n' for n in range(20)
+    )
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>Gold news</title>'
+        f'<style>p {{ margin: 0 }} .nav a {{ color: #333 }}</style>{scripts}</head><body>'
+        '<nav class="nav">' + ''.join(f'<a href="/s/{n}">Section {n}</a>' for n in range(40)) + '</nav>'
+        '<!-- article starts --><article>' + '\n'.join(body) + '</article>'
+        '<aside><p>Subscribe to our newsletter</p><ul>' + '<li>Link</li>' * 50 + '</ul></aside>'
+        '<footer><p>&copy; 2026 Example News</footer></body></html>'
+    )
+
+
+def generate_corpus(directory, num_pages, seed=0):
+    """Write num_pages synthetic pages (a mix of short, typical and very long ones) as .html.gz"""
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    for n in range(num_pages):
+        paragraphs = rng.choice([8, 20, 40, 60, 120, 400])
+        with gzip.open(os.path.join(directory, f"page_{n:04d}.html.gz"), 'wt', encoding='utf-8') as handle:
+            handle.write(generate_page(rng, paragraphs))
+
+
+def load_corpus(directory):
+    """Raw bytes of every .html / .html.gz page in a directory, or of the HTML pages in a replay corpus"""
+    if os.path.exists(os.path.join(directory, INDEX_FILE)):
+        corpus = ResponseCorpus(directory)
+        return [
+            corpus.get(url)[2] for url, entry in sorted(corpus.entries.items())
+            if entry['status'] == 200 and 'html' in entry['headers'].get('Content-Type', '')
+        ]
+
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, '*.html')) + glob.glob(os.path.join(directory, '*.html.gz'))):
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rb') as handle:
+            pages.append(handle.read())
+    return pages
+
+
+def time_extractor(extract, texts, repeats):
+    """Best-of-N wall time to extract every page"""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for text in texts:
+            extract(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def peak_allocation_mb(extract, text):
+    """Peak traced allocation while extracting one page"""
+    tracemalloc.start()
+    extract(text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def main():
+    """Run the extraction benchmark"""
+    parser = argparse.ArgumentParser(description="<p> text extraction benchmark against BeautifulSoup")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="directory of .html / .html.gz pages, or a replay.py corpus")
+    parser.add_argument("--generate", type=int, default=200, help="synthetic pages to write if the corpus is empty")
+    parser.add_argument("--max-bytes", type=int, default=MAX_PAGE_BYTES, help="per-page byte cap")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--workers", type=int, nargs="*", default=[2, 4], help="process pool sizes to try")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus)
+    if not pages:
+        print(f"📦 No pages in {args.corpus}/, generating {args.generate} synthetic pages")
+        generate_corpus(args.corpus, args.generate)
+        pages = load_corpus(args.corpus)
+
+    capped = [page[:args.max_bytes] for page in pages]
+    texts = [page.decode('utf-8', errors='replace') for page in capped]
+    total_mb = sum(len(page) for page in capped) / 1e6
+    largest = max(texts, key=len)
+
+    print("=" * 80)
+    print("HTML Extraction Benchmark")
+    print("=" * 80)
+    print(f"Corpus: {len(pages)} pages, {total_mb:.1f}MB after the {args.max_bytes / 1e6:.1f}MB cap "
+          f"({sum(len(page) > args.max_bytes for page in pages)} pages truncated)\n")
+
+    reference = [EXTRACTORS['bs4'](text) for text in texts]
+
+    print(f"{'Extractor':<12} {'Pages/sec':<12} {'MB/sec':<10} {'Speedup':<10} {'Peak alloc':<13} {'Text match'}")
+    print("-" * 80)
+    baseline = None
+    for name in ['bs4'] + [name for name in EXTRACTORS if name != 'bs4']:
+        extract = EXTRACTORS[name]
+        try:
+            elapsed = time_extractor(extract, texts, args.repeats)
+        except ImportError as error:
+            print(f"{name:<12} ⚠️  skipped: {error}")
+            continue
+
+        baseline = baseline or elapsed
+        matches = sum(extract(text) == expected for text, expected in zip(texts, reference))
+        speedup = f"{baseline / elapsed:.2f}x"
+        print(f"{name:<12} {len(texts) / elapsed:<12.1f} {total_mb / elapsed:<10.1f} {speedup:<10} "
+              f"{peak_allocation_mb(extract, largest):<10.1f}MB  {matches}/{len(texts)}")
+
+    # Parsing spread across processes (what prefetch_content(parse_workers=N) does)
+    print(f"\n{'Process pool':<16} {'Pages/sec':<12} {'MB/sec'}")
+    print("-" * 40)
+    for workers in args.workers:
+        with parse_pool(workers) as pool:
+            list(pool.map(extract_paragraphs_bytes, capped[:workers], ['utf-8'] * workers))  # start workers
+            start = time.perf_counter()
+            results = list(pool.map(extract_paragraphs_bytes, capped, ['utf-8'] * len(capped), chunksize=4))
+            elapsed = time.perf_counter() - start
+        assert results == reference, "pool extraction differs from BeautifulSoup"
+        print(f"{f'stream x {workers}':<16} {len(capped) / elapsed:<12.1f} {total_mb / elapsed:.1f}")
+
+    print("\n" + "=" * 80)
+    print("✅ Benchmark Complete!")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Article Memory Benchmark
+Peak RSS per 10k scraped articles: the old dict records that kept every page for the whole run,
+versus slotted Article records with compressed content, versus releasing content once scored
+"""
+
+import argparse
+import importlib
+import random
+import resource
+import subprocess
+import sys
+
+MODES = {
+    'dict': "dict per article, content kept for the whole run (before)",
+    'dict-released': "dict per article, content dropped after each scored batch",
+    'article': "slotted Article, content compressed and kept",
+    'article-released': "slotted Article, content dropped after each scored batch (after)",
+}
+SOURCES = [f"Outlet {n} News" for n in range(50)]
+QUERIES = ["gold market", "gold price", "gold forecast", "gold news", "gold investment"]
+
+
+def synthetic_text(num_chars, seed=0, vocabulary=5000):
+    """English-like filler: Zipf-distributed pseudo-words, so it compresses roughly like real prose"""
+    rng = random.Random(seed)
+    letters = 'etaoinshrdlcumwfgypbvkjxqz'
+    words = [''.join(rng.choices(letters, weights=range(26, 0, -1), k=rng.randint(2, 10))) for _ in range(vocabulary)]
+    weights = [1 / rank for rank in range(1, vocabulary + 1)]
+    text = []
+    length = 0
+    while length < num_chars:
+        sentence = ' '.join(rng.choices(words, weights=weights, k=rng.randint(8, 30))).capitalize() + '. '
+        text.append(sentence)
+        length += len(sentence)
+    return ''.join(text)
+
+
+def current_rss_mb():
+    """Resident set size right now (Linux /proc), in MB"""
+    with open('/proc/self/statm') as handle:
+        return int(handle.read().split()[1]) * resource.getpagesize() / 1e6
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process, in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+
+
+def build_articles(mode, num_articles, content_chars, batch_size=32):
+    """Create articles the way a content scan does, 'score' them in batches, return what stays alive"""
+    from news_fetcher import Article
+
+    corpus = synthetic_text(content_chars * 40)
+    rng = random.Random(1)
+    articles = []
+    batch = []
+    for n in range(num_articles):
+        # Fresh string objects per article, as the feed parser and page extractor produce them
+        start = rng.randrange(len(corpus) - content_chars)
+        fields = dict(
+            id=f"tag:news.google.com,2026:{n:012d}",
+            title=corpus[start:start + 80].strip(),
+            link=f"https://news.example.com/articles/{n:08d}/{corpus[start:start + 40].replace(' ', '-')}",
+            published=f"Mon, {n % 28 + 1:02d} Sep 2026 {n % 24:02d}:{n % 60:02d}:00 GMT",
+            source=''.join(list(SOURCES[n % len(SOURCES)])),
+            query=''.join(list(QUERIES[n % len(QUERIES)])),
+            content=corpus[start:start + content_chars] + str(n),
+        )
+        article = dict(fields) if mode.startswith('dict') else Article(**fields)
+        articles.append(article)
+        batch.append(article)
+
+        if len(batch) == batch_size:
+            # The scorer reads each text once
+            sum(len(article['content']) for article in batch)
+            if mode.endswith('-released'):
+                for article in batch:
+                    article.pop('content', None)
+            batch = []
+    return articles
+
+
+def run_child(mode, num_articles, content_chars):
+    """Measure one mode in this (fresh) process and print 'peak_mb baseline_mb count'"""
+    # Imports are part of the baseline, not the articles
+    importlib.import_module('news_fetcher')
+
+    synthetic_text(content_chars * 40)  # same scratch allocation in every mode
+    baseline = current_rss_mb()
+    articles = build_articles(mode, num_articles, content_chars)
+    print(f"{peak_rss_mb():.1f} {baseline:.1f} {len(articles)}")
+
+
+def main():
+    """Run every mode in its own process and compare peak RSS"""
+    parser = argparse.ArgumentParser(description="Peak RSS of article records per 10k articles")
+    parser.add_argument("--articles", type=int, default=10_000)
+    parser.add_argument("--content-chars", type=int, default=6_000, help="extracted page text per article")
+    parser.add_argument("--child", choices=list(MODES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.articles, args.content_chars)
+        return
+
+    import zlib
+
+    sample = synthetic_text(args.content_chars * 40).encode('utf-8')
+    print("=" * 80)
+    print("Article Memory Benchmark")
+    print("=" * 80)
+    print(f"{args.articles} articles, {args.content_chars} chars of page text each "
+          f"(synthetic text, zlib ratio {len(sample) / len(zlib.compress(sample, 1)):.1f}x)\n")
+
+    print(f"{'Mode':<18} {'Peak RSS growth':<17} {'Per 10k articles':<18} {'vs dict':<9} {'Records'}")
+    print("-" * 80)
+    reference = None
+    for mode, description in MODES.items():
+        output = subprocess.run(
+            [sys.executable, __file__, '--child', mode, '--articles', str(args.articles),
+             '--content-chars', str(args.content_chars)],
+            capture_output=True, text=True, check=True
+        ).stdout.split()
+        growth = float(output[0]) - float(output[1])
+        per_10k = growth * 10_000 / args.articles
+        reference = reference or growth
+        print(f"{mode:<18} {f'{growth:.1f}MB':<17} {f'{per_10k:.1f}MB':<18} {f'{growth / reference:.0%}':<9} {description}")
+
+    print("\n" + "=" * 80)
+    print("✅ Benchmark Complete!")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
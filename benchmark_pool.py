@@ -0,0 +1,93 @@
+"""
+Inference Pool Benchmark
+Headlines/sec of the multi-process FinBERT pool versus a single process, across worker counts
+"""
+
+import argparse
+import time
+
+from inference_pool import FinBertPool, available_cores
+from batch_scheduler import schedule_batches
+from model_registry import get_model, get_device
+from quick_compare import test_headlines
+
+
+def measure(score_func, repeats):
+    """Best-of-N wall time of score_func()"""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        score_func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    """Run the scaling benchmark"""
+    parser = argparse.ArgumentParser(description="FinBERT inference pool scaling benchmark")
+    parser.add_argument("--headlines", type=int, default=2000, help="number of headlines per run")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--workers", type=int, nargs="*", help="worker counts to try (default: 1, 2, 4, ... cores)")
+    args = parser.parse_args()
+
+    import torch
+
+    cores = available_cores()
+    worker_counts = args.workers or sorted({2 ** i for i in range(cores.bit_length()) if 2 ** i <= cores} | {cores})
+
+    print("=" * 70)
+    print("FinBERT Inference Pool - Scaling Benchmark")
+    print("=" * 70)
+    print(f"Device: {get_device()} | Cores: {cores} | Headlines: {args.headlines} | Batch size: {args.batch_size}")
+
+    texts = (test_headlines * (args.headlines // len(test_headlines) + 1))[:args.headlines]
+    finbert = get_model('finbert')
+    encoded = finbert.tokenizer(texts, truncation=True, max_length=512)
+    batches = schedule_batches([len(ids) for ids in encoded['input_ids']], max_batch_size=args.batch_size)
+
+    # Baseline: one process using every core for intra-op parallelism
+    torch.set_num_threads(cores)
+
+    def score_single():
+        for batch in batches:
+            features = [{key: encoded[key][i] for key in encoded.keys()} for i in batch]
+            inputs = finbert.tokenizer.pad(features, return_tensors="pt")
+            with torch.inference_mode():
+                finbert.model(**inputs)
+
+    score_single()  # warm up
+    baseline = args.headlines / measure(score_single, args.repeats)
+
+    print(f"\n{'Mode':<28} {'Headlines/sec':<16} {'Speedup':<10} {'Scaling eff.'}")
+    print("-" * 70)
+    print(f"{f'single process ({cores} threads)':<28} {baseline:<16.1f} {'1.00x':<10} -")
+
+    results = []
+    for num_workers in worker_counts:
+        pool = FinBertPool(num_workers=num_workers).start()
+        try:
+            pool.predict_logits(encoded, batches[:num_workers])  # warm up every worker
+            throughput = args.headlines / measure(lambda: pool.predict_logits(encoded, batches), args.repeats)
+        finally:
+            pool.close()
+
+        speedup = throughput / baseline
+        results.append((num_workers, throughput))
+        mode = f"pool {num_workers} x {pool.threads_per_worker} threads"
+        print(f"{mode:<28} {throughput:<16.1f} {f'{speedup:.2f}x':<10} {speedup / num_workers * 100:.0f}%")
+
+    single_worker = dict(results).get(1)
+    if single_worker:
+        print(f"\n📈 Scaling vs 1 worker:")
+        for num_workers, throughput in results:
+            print(f"   {num_workers:>3} workers: {throughput / single_worker:.2f}x (ideal {num_workers}x)")
+
+    print("\n" + "=" * 70)
+    print("✅ Benchmark Complete!")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Benchmark Suite
+perf_counter_ns timings with warmup and repeat phases for engine latency, throughput across
+batch sizes / engines / text lengths, and the fetch -> parse -> score -> summarize pipeline,
+written as JSON and compared against a stored baseline to catch regressions
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+DEFAULT_OUTPUT = "benchmark_results.json"
+DEFAULT_BASELINE = "benchmark_baseline.json"
+DEFAULT_TOLERANCE = 0.15
+
+_FILLER = ("Analysts said the move reflected shifting expectations for interest rates, central bank "
+           "purchases and safe haven demand, while traders watched inflation data, the dollar and "
+           "Treasury yields for signs of a change in trend.")
+
+
+def measure_ns(func, warmup=3, repeats=20):
+    """Call func warmup times untimed, then repeats times; returns the timed durations in ns"""
+    for _ in range(warmup):
+        func()
+    samples = np.empty(repeats, dtype=np.int64)
+    for i in range(repeats):
+        start = time.perf_counter_ns()
+        func()
+        samples[i] = time.perf_counter_ns() - start
+    return samples
+
+
+def summarize_ns(samples, items=1):
+    """Latency percentiles in ms, plus items/sec at the median, for a sample array"""
+    ms = np.asarray(samples, dtype=np.float64) / 1e6
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        'repeats': int(len(ms)),
+        'items': items,
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'mean_ms': float(ms.mean()),
+        'min_ms': float(ms.min()),
+        'max_ms': float(ms.max()),
+        'items_per_sec': items / (p50 / 1e3) if p50 > 0 else 0.0,
+    }
+
+
+def benchmark(func, items=1, warmup=3, repeats=20):
+    """measure_ns + summarize_ns in one call"""
+    return summarize_ns(measure_ns(func, warmup, repeats), items)
+
+
+def make_texts(length, count):
+    """Headline-derived texts: 'short' (headline), 'medium' (~60 words) or 'long' (~250 words)"""
+    from quick_compare import test_headlines
+
+    sentences = {'short': 0, 'medium': 1, 'long': 6}[length]
+    texts = []
+    for i in range(count):
+        headline = test_headlines[i % len(test_headlines)]
+        texts.append(' '.join([headline + '.'] + [_FILLER] * sentences) if sentences else headline)
+    return texts
+
+
+def run_latency(engines, warmup, repeats):
+    """Single-headline latency per engine (the model is loaded during warmup, never timed)"""
+    from quick_compare import test_headlines
+    from sentiment_engines import get_engine
+
+    results = {}
+    for name in engines:
+        engine = get_engine(name)
+        engine.warm_up()
+        headlines = iter(test_headlines * (warmup + repeats))
+        results[f"latency/{name}"] = benchmark(lambda: engine.score_batch([next(headlines)]), 1, warmup, repeats)
+    return results
+
+
+def run_throughput(engines, batch_sizes, lengths, num_texts, warmup, repeats):
+    """Texts/sec for every engine x batch size x text length"""
+    from sentiment_engines import get_engine
+
+    results = {}
+    for name in engines:
+        engine = get_engine(name)
+        engine.warm_up()
+        for length in lengths:
+            texts = make_texts(length, num_texts)
+            for batch_size in batch_sizes:
+                def score():
+                    for start in range(0, len(texts), batch_size):
+                        engine.score_batch(texts[start:start + batch_size], batch_size=batch_size)
+
+                results[f"throughput/{name}/{length}/b{batch_size}"] = benchmark(score, len(texts), warmup, repeats)
+    return results
+
+
+def run_documents(engine_name, num_documents, aggregations, warmup, repeats):
+    """Full-article scoring in tokens/sec: truncated at 512 tokens vs overlapping windows per aggregation"""
+    from model_registry import get_model
+    from sentiment_engines import get_engine
+
+    engine = get_engine(engine_name)
+    engine.warm_up()
+    # Article bodies from one to ~8 model windows long
+    documents = [' '.join(make_texts('long', 1 + i % 8)) for i in range(num_documents)]
+    tokenizer = get_model('finbert').tokenizer
+    num_tokens = sum(len(ids) for ids in tokenizer(documents, add_special_tokens=False)['input_ids'])
+
+    results = {f"documents/{engine_name}/truncated": benchmark(lambda: engine.score_batch(documents),
+                                                               num_tokens, warmup, repeats)}
+    for aggregate in aggregations:
+        results[f"documents/{engine_name}/{aggregate}"] = benchmark(
+            lambda: engine.score_documents(documents, aggregate=aggregate), num_tokens, warmup, repeats
+        )
+    return results
+
+
+def run_pipeline(engine, queries, num_articles, warmup, repeats):
+    """End-to-end stages: fetch (RSS), parse (article HTML), score (titles), summarize (label counts)"""
+    import news_fetcher
+    from benchmark_html import DEFAULT_CORPUS, generate_page, load_corpus
+    from html_extract import MAX_PAGE_BYTES, extract_paragraphs
+    from sentiment_scoring import score_sentiments
+    from sentiment_engines import label_distribution
+
+    results = {}
+
+    def fetch():
+        # Cold fetch every time: no conditional-GET shortcut from the previous repeat
+        with news_fetcher._feed_cache_lock:
+            news_fetcher._feed_cache.clear()
+        return news_fetcher.fetch_news_many(queries, num_articles)
+
+    articles = [article for query_articles in fetch() for article in query_articles]
+    if articles:
+        results['pipeline/fetch'] = benchmark(fetch, len(articles), min(warmup, 1), min(repeats, 5))
+        titles = [article['title'] for article in articles]
+    else:
+        print("   ⚠️  No articles fetched (offline?); set NEWS_CORPUS to a replay corpus. Scoring test headlines.")
+        titles = make_texts('short', 60)
+
+    pages = load_corpus(news_fetcher.NEWS_CORPUS or DEFAULT_CORPUS) if os.path.isdir(
+        news_fetcher.NEWS_CORPUS or DEFAULT_CORPUS) else []
+    if pages:
+        texts = [page[:MAX_PAGE_BYTES].decode('utf-8', errors='replace') for page in pages]
+    else:
+        import random
+
+        rng = random.Random(0)
+        texts = [generate_page(rng, paragraphs) for paragraphs in (20, 40, 60, 120) * 5]
+    results['pipeline/parse'] = benchmark(
+        lambda: [extract_paragraphs(text) for text in texts], len(texts), warmup, repeats
+    )
+
+    results['pipeline/score'] = benchmark(
+        lambda: score_sentiments(titles, engine=engine, use_cache=False), len(titles), warmup, repeats
+    )
+
+    label_indices = np.tile(score_sentiments(titles, engine=engine, use_cache=False).label_indices, 1000)
+    results['pipeline/summarize'] = benchmark(
+        lambda: label_distribution(label_indices), len(label_indices), warmup, repeats
+    )
+    return results
+
+
+def environment():
+    """Machine / software description stored with every run"""
+    import torch
+    from model_registry import get_device
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'commit': commit,
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'torch': torch.__version__,
+        'device': str(get_device()),
+        'replay_corpus': os.environ.get("NEWS_CORPUS"),
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Cases whose p50 latency got more than tolerance slower than the baseline"""
+    regressions = []
+    print(f"\n{'Case':<44} {'Baseline p50':<14} {'Now p50':<12} {'Change':<10}")
+    print("-" * 84)
+    for name, stats in results.items():
+        before = baseline.get('results', {}).get(name)
+        if before is None:
+            print(f"{name:<44} {'-':<14} {stats['p50_ms']:<12.3f} new")
+            continue
+        change = stats['p50_ms'] / before['p50_ms'] - 1 if before['p50_ms'] else 0.0
+        flag = ''
+        if change > tolerance:
+            flag = ' ❌ regression'
+            regressions.append(name)
+        elif change < -tolerance:
+            flag = ' ✅ faster'
+        print(f"{name:<44} {before['p50_ms']:<14.3f} {stats['p50_ms']:<12.3f} {change * 100:+.1f}%{flag}")
+    return regressions
+
+
+def print_results(results):
+    """One line per case"""
+    print(f"\n{'Case':<44} {'p50':<10} {'p95':<10} {'p99':<10} {'Items/sec'}")
+    print("-" * 84)
+    for name, stats in results.items():
+        print(f"{name:<44} {stats['p50_ms']:<10.3f} {stats['p95_ms']:<10.3f} {stats['p99_ms']:<10.3f} "
+              f"{stats['items_per_sec']:.1f}")
+
+
+def main():
+    """Run the suite, write JSON, optionally compare against / save a baseline"""
+    parser = argparse.ArgumentParser(description="Sentiment scanner benchmark suite")
+    parser.add_argument("--suites", nargs="*", default=["latency", "throughput", "pipeline"],
+                        choices=["latency", "throughput", "pipeline", "documents"])
+    parser.add_argument("--engines", nargs="*", default=["vader", "finbert"])
+    parser.add_argument("--batch-sizes", type=int, nargs="*", default=[1, 8, 32, 128])
+    parser.add_argument("--lengths", nargs="*", default=["short", "medium", "long"],
+                        choices=["short", "medium", "long"])
+    parser.add_argument("--num-texts", type=int, default=256, help="texts per throughput case")
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=20, help="timed repeats for latency / pipeline cases")
+    parser.add_argument("--throughput-repeats", type=int, default=5)
+    parser.add_argument("--queries", nargs="*", default=["gold market", "gold price", "gold forecast"])
+    parser.add_argument("--num-articles", type=int, default=20)
+    parser.add_argument("--num-documents", type=int, default=32, help="articles per full-document case")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed p50 slowdown before a case counts as a regression")
+    args = parser.parse_args()
+
+    print("=" * 84)
+    print("Benchmark Suite")
+    print("=" * 84)
+    env = environment()
+    print(f"Commit: {env['commit']} | Device: {env['device']} | CPUs: {env['cpu_count']} | "
+          f"Warmup: {args.warmup} | Repeats: {args.repeats}")
+
+    results = {}
+    if "latency" in args.suites:
+        print("\n⏱️  Latency...")
+        results.update(run_latency(args.engines, args.warmup, args.repeats))
+    if "throughput" in args.suites:
+        print("🚀 Throughput...")
+        results.update(run_throughput(args.engines, args.batch_sizes, args.lengths, args.num_texts,
+                                      min(args.warmup, 1), args.throughput_repeats))
+    if "pipeline" in args.suites:
+        print("🔗 Pipeline stages...")
+        results.update(run_pipeline(args.engines[-1], args.queries, args.num_articles, args.warmup, args.repeats))
+
+    if "documents" in args.suites:
+        print("📄 Full-document scoring (items = tokens)...")
+        results.update(run_documents(args.engines[-1], args.num_documents, ["mean", "length", "max"],
+                                     min(args.warmup, 1), args.throughput_repeats))
+
+    print_results(results)
+
+    run = {'environment': env, 'config': vars(args), 'results': results}
+    with open(args.output, 'w') as handle:
+        json.dump(run, handle, indent=2)
+    print(f"\n💾 Results saved to: {args.output}")
+
+    regressions = []
+    if args.save_baseline:
+        with open(args.baseline, 'w') as handle:
+            json.dump(run, handle, indent=2)
+        print(f"📌 Baseline saved to: {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        print(f"\n📊 Against baseline {args.baseline} (commit {baseline['environment'].get('commit')}):")
+        regressions = compare(results, baseline, args.tolerance)
+
+    print("\n" + "=" * 84)
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) beyond {args.tolerance * 100:.0f}%: {', '.join(regressions)}")
+        print("=" * 84)
+        sys.exit(1)
+    print("✅ Benchmark Complete!")
+    print("=" * 84)
+
+
+if __name__ == "__main__":
+    main()
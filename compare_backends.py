@@ -0,0 +1,126 @@
+"""
+FinBERT Backend Comparison
+Agreement with fp32 labels, latency and memory for the int8, TorchScript and ONNX backends,
+then picks the fastest backend that stays within the accuracy tolerance
+"""
+
+import argparse
+import time
+
+import numpy as np
+import psutil
+
+from quick_compare import test_headlines
+from sentiment_engines import get_engine
+
+BACKENDS = ['finbert', 'finbert-int8', 'finbert-torchscript', 'finbert-onnx']
+
+
+def rss_mb():
+    """Resident memory of this process in MB"""
+    return psutil.Process().memory_info().rss / 1e6
+
+
+def profile_backend(name, texts, repeats):
+    """Load a backend and measure memory, single-headline latency and batched throughput"""
+    engine = get_engine(name)
+
+    before = rss_mb()
+    start = time.perf_counter()
+    engine.warm_up()
+    load_sec = time.perf_counter() - start
+    memory_mb = rss_mb() - before
+
+    label_indices, scores = engine.score_batch(test_headlines)
+
+    # Single-headline latency
+    latencies = []
+    for _ in range(repeats):
+        for headline in test_headlines:
+            start = time.perf_counter()
+            engine.score_batch([headline])
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    # Batched throughput (best of repeats)
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        engine.score_batch(texts)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return {
+        'name': name,
+        'labels': label_indices,
+        'scores': scores,
+        'load_sec': load_sec,
+        'memory_mb': memory_mb,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'throughput_per_sec': len(texts) / best,
+    }
+
+
+def main():
+    """Compare every available backend against fp32 FinBERT"""
+    parser = argparse.ArgumentParser(description="FinBERT backend agreement / latency / memory comparison")
+    parser.add_argument("--tolerance", type=float, default=0.95,
+                        help="minimum label agreement with fp32 for a backend to be eligible")
+    parser.add_argument("--batch-texts", type=int, default=512, help="headlines in the throughput run")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--backends", nargs="*", default=BACKENDS)
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("FinBERT Backend Comparison")
+    print("=" * 80)
+    print(f"Agreement set: quick_compare.test_headlines ({len(test_headlines)} headlines)")
+    print(f"Tolerance: >= {args.tolerance * 100:.0f}% label agreement with fp32\n")
+
+    # Import the frameworks up front so memory deltas only count each backend's model
+    import torch  # noqa: F401
+    import transformers  # noqa: F401
+
+    texts = (test_headlines * (args.batch_texts // len(test_headlines) + 1))[:args.batch_texts]
+    backends = ['finbert'] + [name for name in args.backends if name != 'finbert']
+
+    results = []
+    for name in backends:
+        print(f"   Profiling {name}...")
+        try:
+            results.append(profile_backend(name, texts, args.repeats))
+        except ImportError as error:
+            print(f"   ⚠️  Skipping {name}: {error}")
+
+    reference = results[0]
+    print(f"\n{'Backend':<22} {'Agree':<9} {'Max Δconf':<11} {'p50':<10} {'p95':<10} "
+          f"{'Batched':<13} {'Memory':<10} {'Load'}")
+    print("-" * 100)
+
+    eligible = []
+    for result in results:
+        result['agreement'] = float(np.mean(result['labels'] == reference['labels']))
+        result['max_confidence_delta'] = float(np.max(np.abs(result['scores'] - reference['scores'])))
+        if result['agreement'] >= args.tolerance:
+            eligible.append(result)
+
+        agreement = f"{result['agreement'] * 100:.1f}%" + ('' if result['agreement'] >= args.tolerance else ' ✗')
+        p50 = f"{result['p50_ms']:.2f}ms"
+        p95 = f"{result['p95_ms']:.2f}ms"
+        throughput = f"{result['throughput_per_sec']:.1f}/sec"
+        memory = f"{result['memory_mb']:.1f}MB"
+        print(f"{result['name']:<22} {agreement:<9} {result['max_confidence_delta']:<11.2e} {p50:<10} {p95:<10} "
+              f"{throughput:<13} {memory:<10} {result['load_sec']:.1f}s")
+
+    best = max(eligible, key=lambda result: result['throughput_per_sec'])
+    speedup = best['throughput_per_sec'] / reference['throughput_per_sec']
+    print(f"\n🏆 Fastest backend within tolerance: {best['name']} ({speedup:.2f}x fp32 throughput)")
+    print(f"   Use it with: SENTIMENT_ENGINE={best['name']}")
+
+    print("\n" + "=" * 80)
+    print("✅ Comparison Complete!")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
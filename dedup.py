@@ -0,0 +1,175 @@
+"""
+Article Deduplication
+Cross-query dedup on canonical link and normalized title, with optional SimHash near-duplicates
+"""
+
+import hashlib
+import heapq
+import re
+import time
+import unicodedata
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from news_fetcher import published_epoch
+
+# Query parameters that never change which story a link points to
+TRACKING_PARAMS = {'oc', 'fbclid', 'gclid', 'ocid', 'cmpid', 'ref', 'guccounter', 'ito', 'smid', 'mc_cid', 'mc_eid'}
+
+_punctuation = re.compile(r"[^\w\s]")
+
+
+def canonicalize_link(url):
+    """Canonical form of a link: lowercase host without www, no fragment, tracking or trailing slash"""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith('utm_')
+    ]
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), host, path, urlencode(sorted(query)), ''))
+
+
+def normalize_title(title, source=None):
+    """Normalized title: outlet suffix removed, casefolded, punctuation and extra whitespace dropped"""
+    title = unicodedata.normalize('NFKC', title)
+    # Google News appends " - Outlet" to every title; syndicated copies differ only there
+    if source and title.endswith(f" - {source}"):
+        title = title[:-len(source) - 3]
+    title = _punctuation.sub(' ', title.casefold())
+    return ' '.join(title.split())
+
+
+def simhash(text, bits=64):
+    """SimHash fingerprint over word unigrams and bigrams"""
+    words = text.split()
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    weights = [0] * bits
+    for feature in features:
+        value = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=bits // 8).digest(), 'big')
+        for bit in range(bits):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+class ArticleDeduplicator:
+    """Tracks seen articles across queries and reports duplicates per query
+
+    With max_age (seconds), an article is forgotten once its publish time (the time it was
+    added if unknown) is older than that, so a long-running scanner's memory stays bounded.
+    """
+
+    def __init__(self, near_duplicates=False, max_distance=6, bits=64, max_age=None):
+        self.near_duplicates = near_duplicates
+        self.max_age = max_age
+        self.max_distance = max_distance
+        self.bits = bits
+        # With max_distance + 1 bands, two hashes within max_distance always share a band
+        self.bands = max_distance + 1
+        self.band_bits = bits // self.bands
+
+        self.seen_links = set()
+        self.seen_titles = set()
+        # Per band: band value -> fingerprints
+        self.band_index = [{} for _ in range(self.bands)]
+        self.report = {}
+        # With max_age: min-heap of (expiry, sequence, link, title, fingerprint)
+        self._expiries = []
+        self._sequence = 0
+
+    def __len__(self):
+        return len(self.seen_links)
+
+    def prune(self, now=None):
+        """Forget articles that expired by `now` (no-op without max_age)"""
+        now = time.time() if now is None else now
+        while self._expiries and self._expiries[0][0] <= now:
+            _, _, link, title, fingerprint = heapq.heappop(self._expiries)
+            self.seen_links.discard(link)
+            if title:
+                self.seen_titles.discard(title)
+            if fingerprint is not None:
+                for band, value in enumerate(self._bands(fingerprint)):
+                    fingerprints = self.band_index[band][value]
+                    fingerprints.remove(fingerprint)
+                    if not fingerprints:
+                        del self.band_index[band][value]
+
+    def _bands(self, fingerprint):
+        mask = (1 << self.band_bits) - 1
+        return [(fingerprint >> (band * self.band_bits)) & mask for band in range(self.bands)]
+
+    def _is_near_duplicate(self, fingerprint):
+        for band, value in enumerate(self._bands(fingerprint)):
+            for other in self.band_index[band].get(value, ()):
+                if bin(fingerprint ^ other).count('1') <= self.max_distance:
+                    return True
+        return False
+
+    def add(self, article, query=None, now=None):
+        """Register an article, returns True if it is new and False if it duplicates one already seen"""
+        if self.max_age is not None:
+            now = time.time() if now is None else now
+            self.prune(now)
+        query = query if query is not None else article.get('query')
+        counts = self.report.setdefault(query, {'fetched': 0, 'duplicates': 0, 'unique': 0})
+        counts['fetched'] += 1
+
+        link = canonicalize_link(article['link'])
+        title = normalize_title(article['title'], article.get('source'))
+        fingerprint = simhash(title, self.bits) if self.near_duplicates and title else None
+
+        duplicate = link in self.seen_links or (title and title in self.seen_titles)
+        if not duplicate and fingerprint is not None:
+            duplicate = self._is_near_duplicate(fingerprint)
+
+        if duplicate:
+            counts['duplicates'] += 1
+            return False
+
+        counts['unique'] += 1
+        self.seen_links.add(link)
+        if title:
+            self.seen_titles.add(title)
+        if fingerprint is not None:
+            for band, value in enumerate(self._bands(fingerprint)):
+                self.band_index[band].setdefault(value, []).append(fingerprint)
+        if self.max_age is not None:
+            published = published_epoch(article.get('published'))
+            expiry = min(now if published is None else published, now) + self.max_age
+            heapq.heappush(self._expiries, (expiry, self._sequence, link, title, fingerprint))
+            self._sequence += 1
+        return True
+
+    def filter(self, articles, query=None):
+        """Keep only the articles not seen before, in order"""
+        return [article for article in articles if self.add(article, query)]
+
+
+def dedupe_articles(queries, results, near_duplicates=False, max_distance=6):
+    """Flatten per-query results into one duplicate-free list, returns (articles, per-query report)"""
+    deduplicator = ArticleDeduplicator(near_duplicates=near_duplicates, max_distance=max_distance)
+    unique = []
+    for query, articles in zip(queries, results):
+        unique.extend(deduplicator.filter(articles, query))
+    return unique, deduplicator.report
+
+
+def print_dedup_report(report):
+    """Print how many duplicates each query contributed"""
+    print("\n--- Deduplication ---")
+    total_fetched = sum(counts['fetched'] for counts in report.values())
+    total_duplicates = sum(counts['duplicates'] for counts in report.values())
+    for query, counts in report.items():
+        print(f"{query}: {counts['fetched']} fetched, {counts['duplicates']} duplicates, {counts['unique']} new")
+    print(f"Total: {total_fetched} fetched, {total_duplicates} duplicates removed, "
+          f"{total_fetched - total_duplicates} unique")
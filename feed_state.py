@@ -0,0 +1,231 @@
+"""
+Feed State
+Persistent per-query high-water marks (seen entry ids and publish times) and merged sentiment
+aggregates, so repeated scans only fetch content for and score the entries they have not seen
+"""
+
+import argparse
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from dedup import canonicalize_link
+from news_fetcher import fetch_news_many, published_epoch
+from sentiment_engines import LABELS, SentimentScores
+
+DEFAULT_STATE_PATH = "feed_state.db"
+
+
+def entry_key(article):
+    """Stable identity of a feed entry: its RSS id/guid, else its canonical link"""
+    return article.get('id') or canonicalize_link(article['link'])
+
+
+class FeedState:
+    """SQLite-backed seen-entry sets and sentiment totals, one row per query"""
+
+    def __init__(self, path=DEFAULT_STATE_PATH, max_entries_per_query=2000):
+        self.path = path
+        self.max_entries_per_query = max_entries_per_query
+        self._seen = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS seen_entries ("
+            "query TEXT NOT NULL, key TEXT NOT NULL, published REAL, first_seen REAL NOT NULL, "
+            "PRIMARY KEY (query, key))"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS query_state ("
+            "query TEXT PRIMARY KEY, high_water REAL, low_water REAL, "
+            "positive INTEGER NOT NULL DEFAULT 0, negative INTEGER NOT NULL DEFAULT 0, "
+            "neutral INTEGER NOT NULL DEFAULT 0, score_sum REAL NOT NULL DEFAULT 0, "
+            "scans INTEGER NOT NULL DEFAULT 0, last_scan REAL)"
+        )
+        self._db.commit()
+
+    def _seen_keys(self, query):
+        """In-memory set of seen keys for a query (loaded from disk once)"""
+        if query not in self._seen:
+            rows = self._db.execute("SELECT key FROM seen_entries WHERE query = ?", (query,))
+            self._seen[query] = {key for (key,) in rows}
+        return self._seen[query]
+
+    def _row(self, query):
+        row = self._db.execute(
+            "SELECT high_water, low_water, positive, negative, neutral, score_sum, scans, last_scan "
+            "FROM query_state WHERE query = ?", (query,)
+        ).fetchone()
+        return row or (None, None, 0, 0, 0, 0.0, 0, None)
+
+    def new_articles(self, query, articles):
+        """Articles of a query not handled by an earlier scan
+
+        Entries older than the low-water mark (the oldest publish time still tracked after
+        pruning) are treated as seen, so pruned entries are never rescored.
+        """
+        with self._lock:
+            seen = self._seen_keys(query)
+            low_water = self._row(query)[1]
+        new = []
+        keys = set()
+        for article in articles:
+            key = entry_key(article)
+            if key in seen or key in keys:
+                continue
+            published = published_epoch(article.get('published'))
+            if low_water is not None and published is not None and published <= low_water:
+                continue
+            keys.add(key)
+            new.append(article)
+        return new
+
+    def record(self, query, articles, label_indices, scores):
+        """Mark a query's new articles as seen and merge their scores into the stored totals"""
+        now = time.time()
+        counts = np.bincount(np.asarray(label_indices, dtype=np.intp), minlength=len(LABELS)).tolist()
+        published = [published_epoch(article.get('published')) for article in articles]
+        known = [epoch for epoch in published if epoch is not None]
+
+        with self._lock:
+            high_water, low_water, positive, negative, neutral, score_sum, scans, _ = self._row(query)
+            if known:
+                high_water = max(known + ([high_water] if high_water is not None else []))
+
+            seen = self._seen_keys(query)
+            rows = []
+            for article, epoch in zip(articles, published):
+                key = entry_key(article)
+                seen.add(key)
+                rows.append((query, key, epoch, now))
+
+            self._db.executemany(
+                "INSERT OR IGNORE INTO seen_entries (query, key, published, first_seen) VALUES (?, ?, ?, ?)", rows
+            )
+            low_water = self._prune(query, seen, low_water)
+            self._db.execute(
+                "INSERT OR REPLACE INTO query_state "
+                "(query, high_water, low_water, positive, negative, neutral, score_sum, scans, last_scan) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (query, high_water, low_water, positive + counts[0], negative + counts[1], neutral + counts[2],
+                 score_sum + float(np.sum(scores, dtype=np.float64)), scans + 1, now)
+            )
+            self._db.commit()
+
+    def _prune(self, query, seen, low_water):
+        """Keep only the newest max_entries_per_query keys, raising the low-water mark"""
+        overflow = len(seen) - self.max_entries_per_query
+        if overflow <= 0:
+            return low_water
+
+        dropped = self._db.execute(
+            "SELECT key, published FROM seen_entries WHERE query = ? "
+            "ORDER BY COALESCE(published, first_seen) LIMIT ?", (query, overflow)
+        ).fetchall()
+        self._db.executemany("DELETE FROM seen_entries WHERE query = ? AND key = ?",
+                             [(query, key) for key, _ in dropped])
+        for key, _ in dropped:
+            seen.discard(key)
+
+        newest_dropped = max((epoch for _, epoch in dropped if epoch is not None), default=None)
+        if newest_dropped is not None:
+            low_water = newest_dropped if low_water is None else max(low_water, newest_dropped)
+        return low_water
+
+    def aggregates(self, query):
+        """Stored totals for a query across every scan"""
+        high_water, _, positive, negative, neutral, score_sum, scans, last_scan = self._row(query)
+        total = positive + negative + neutral
+        return {
+            'distribution': dict(zip(LABELS, (positive, negative, neutral))),
+            'total': total,
+            'mean_score': score_sum / total if total else 0.0,
+            'scans': scans,
+            'high_water': high_water,
+            'last_scan': last_scan,
+        }
+
+    def reset(self, query=None):
+        """Forget one query (or every query)"""
+        with self._lock:
+            where, params = ("WHERE query = ?", (query,)) if query is not None else ("", ())
+            self._db.execute(f"DELETE FROM seen_entries {where}", params)
+            self._db.execute(f"DELETE FROM query_state {where}", params)
+            self._db.commit()
+            if query is None:
+                self._seen.clear()
+            else:
+                self._seen.pop(query, None)
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+def scan_incremental(queries, state, num_articles=100, engine=None, field='title', batch_size=32,
+                     release_content=True, aggregate='mean'):
+    """Fetch every query, then download content for and score only the unseen entries
+
+    Returns (query -> new articles, query -> SentimentScores for them). The scores are
+    merged into the stored aggregates; with release_content, page text is dropped once scored.
+    Content is scored in full, its windows combined by `aggregate` (None truncates at 512 tokens).
+    """
+    from sentiment_scoring import score_documents, score_sentiments
+
+    results = fetch_news_many(queries, num_articles, fetch_content=(field == 'content'), state=state)
+    new = dict(zip(queries, results))
+
+    texts = [article[field] for articles in new.values() for article in articles]
+    if field == 'content' and aggregate is not None:
+        scores = score_documents(texts, engine=engine, aggregate=aggregate, batch_size=batch_size)
+    else:
+        scores = score_sentiments(texts, engine=engine, batch_size=batch_size)
+    del texts
+    if release_content:
+        for articles in new.values():
+            for article in articles:
+                article.pop('content', None)
+
+    per_query = {}
+    start = 0
+    for query, articles in new.items():
+        end = start + len(articles)
+        per_query[query] = SentimentScores(scores.label_indices[start:end], scores.scores[start:end])
+        state.record(query, articles, per_query[query].label_indices, per_query[query].scores)
+        start = end
+    return new, per_query
+
+
+def main():
+    """Run one incremental scan and print stored per-query totals"""
+    parser = argparse.ArgumentParser(description="Incremental news sentiment scan")
+    parser.add_argument("queries", nargs="*", default=["gold market", "gold price", "gold forecast"])
+    parser.add_argument("--state", default=DEFAULT_STATE_PATH, help="SQLite state file")
+    parser.add_argument("--num-articles", type=int, default=100)
+    parser.add_argument("--engine", default=None)
+    parser.add_argument("--reset", action="store_true", help="forget stored state first")
+    args = parser.parse_args()
+
+    state = FeedState(args.state)
+    if args.reset:
+        state.reset()
+
+    start = time.perf_counter()
+    new, _ = scan_incremental(args.queries, state, args.num_articles, engine=args.engine)
+    elapsed = time.perf_counter() - start
+
+    print(f"Scan took {elapsed:.2f}s, {sum(len(articles) for articles in new.values())} new entries\n")
+    for query in args.queries:
+        totals = state.aggregates(query)
+        split = ', '.join(f"{label}: {count}" for label, count in totals['distribution'].items())
+        print(f"{query}: +{len(new[query])} new | {totals['total']} total over {totals['scans']} scans ({split})")
+    state.close()
+
+
+if __name__ == "__main__":
+    main()
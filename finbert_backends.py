@@ -0,0 +1,142 @@
+"""
+FinBERT CPU Backends
+Dynamic int8 quantization, TorchScript and ONNX Runtime variants of FinBERT, each exposed
+as a sentiment engine with the same scoring API as the fp32 model
+"""
+
+import os
+
+from model_registry import FINBERT_MODEL_ID, FinBert, register_loader
+from sentiment_engines import FinBertEngine
+
+FINBERT_ONNX_PATH = os.environ.get("FINBERT_ONNX_PATH", "finbert-tone.onnx")
+ONNX_OPSET = 17
+
+_input_names = ['input_ids', 'attention_mask', 'token_type_ids']
+
+
+def _load_cpu_model():
+    """Fresh fp32 FinBERT on CPU (the shared 'finbert' model may live on the GPU)"""
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    model = AutoModelForSequenceClassification.from_pretrained(FINBERT_MODEL_ID)
+    model.eval()
+    return model, AutoTokenizer.from_pretrained(FINBERT_MODEL_ID)
+
+
+def _logits_module(model):
+    """Wrap a HF model so it takes positional tensors and returns only the logits (traceable)"""
+    import torch
+
+    class LogitsOnly(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.model(
+                input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids
+            ).logits
+
+    return LogitsOnly().eval()
+
+
+def _example_inputs(tokenizer):
+    encoded = tokenizer(["Gold prices surge to record highs", "Oil falls"], return_tensors="pt", padding=True)
+    return tuple(encoded[name] for name in _input_names)
+
+
+def _load_int8():
+    import torch
+
+    model, tokenizer = _load_cpu_model()
+    quantized = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return FinBert(quantized, tokenizer, torch.device("cpu"))
+
+
+def _load_torchscript():
+    import torch
+
+    model, tokenizer = _load_cpu_model()
+    with torch.no_grad():
+        traced = torch.jit.trace(_logits_module(model), _example_inputs(tokenizer))
+    return FinBert(torch.jit.freeze(traced), tokenizer, torch.device("cpu"))
+
+
+def export_onnx(path=FINBERT_ONNX_PATH):
+    """Export FinBERT to an ONNX file with dynamic batch and sequence axes"""
+    import torch
+
+    model, tokenizer = _load_cpu_model()
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in _input_names}
+    dynamic_axes['logits'] = {0: 'batch'}
+    torch.onnx.export(
+        _logits_module(model), _example_inputs(tokenizer), path,
+        input_names=_input_names, output_names=['logits'],
+        dynamic_axes=dynamic_axes, opset_version=ONNX_OPSET, dynamo=False
+    )
+    return path
+
+
+def _load_onnx():
+    import torch
+    from transformers import AutoTokenizer
+
+    try:
+        import onnxruntime
+    except ImportError:
+        raise ImportError("The 'finbert-onnx' engine needs onnxruntime: uv pip install onnxruntime onnx")
+
+    if not os.path.exists(FINBERT_ONNX_PATH):
+        print(f"📦 Exporting FinBERT to ONNX: {FINBERT_ONNX_PATH}")
+        export_onnx(FINBERT_ONNX_PATH)
+
+    options = onnxruntime.SessionOptions()
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    session = onnxruntime.InferenceSession(FINBERT_ONNX_PATH, options, providers=['CPUExecutionProvider'])
+    # Only the tokenizer: loading the fp32 weights here would count against the ONNX memory / load time
+    return FinBert(session, AutoTokenizer.from_pretrained(FINBERT_MODEL_ID), torch.device("cpu"))
+
+
+class FinBertInt8Engine(FinBertEngine):
+    """FinBERT with Linear layers dynamically quantized to int8 (CPU)"""
+
+    name = 'finbert-int8'
+    model_id = f"{FINBERT_MODEL_ID}:int8"
+    model_name = 'finbert-int8'
+
+
+class FinBertTorchScriptEngine(FinBertEngine):
+    """FinBERT traced and frozen with TorchScript (CPU)"""
+
+    name = 'finbert-torchscript'
+    model_id = f"{FINBERT_MODEL_ID}:torchscript"
+    model_name = 'finbert-torchscript'
+
+    def logits(self, finbert, inputs):
+        return finbert.model(*(inputs[name] for name in _input_names))
+
+
+class FinBertOnnxEngine(FinBertEngine):
+    """FinBERT exported to ONNX and run with ONNX Runtime (CPU)"""
+
+    name = 'finbert-onnx'
+    model_id = f"{FINBERT_MODEL_ID}:onnx"
+    model_name = 'finbert-onnx'
+
+    def logits(self, finbert, inputs):
+        import torch
+
+        feeds = {name: inputs[name].numpy() for name in _input_names}
+        return torch.from_numpy(finbert.model.run(['logits'], feeds)[0])
+
+
+register_loader('finbert-int8', _load_int8)
+register_loader('finbert-torchscript', _load_torchscript)
+register_loader('finbert-onnx', _load_onnx)
+
+BACKEND_ENGINES = {
+    'finbert-int8': FinBertInt8Engine,
+    'finbert-torchscript': FinBertTorchScriptEngine,
+    'finbert-onnx': FinBertOnnxEngine,
+}
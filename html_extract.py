@@ -0,0 +1,215 @@
+"""
+HTML Extraction
+Article paragraph text without building a document tree: a streaming <p> collector on the
+stdlib tokenizer that returns the same text as BeautifulSoup's html.parser path, an lxml path
+when lxml is installed, and the original BeautifulSoup path for reference
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from html.entities import html5
+from html.parser import HTMLParser
+
+# Pages are cut off after this many bytes (article text sits well inside the first 2MB)
+MAX_PAGE_BYTES = int(os.environ.get("MAX_PAGE_BYTES", 2_000_000))
+DEFAULT_EXTRACTOR = os.environ.get("HTML_EXTRACTOR", "stream")
+
+# Tags BeautifulSoup treats as empty (never hold text, never need an end tag)
+EMPTY_ELEMENTS = frozenset({
+    'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed', 'frame', 'hr', 'image',
+    'img', 'input', 'isindex', 'keygen', 'link', 'menuitem', 'meta', 'nextid', 'param', 'source',
+    'spacer', 'track', 'wbr',
+})
+# Tags whose strings BeautifulSoup's get_text() leaves out
+HIDDEN_TEXT_ELEMENTS = frozenset({'script', 'style', 'template', 'rt', 'rp'})
+PRESERVE_WHITESPACE_ELEMENTS = frozenset({'pre', 'textarea'})
+_ASCII_SPACES = ' \n\t\x0c\r'
+
+_ENTITIES = {name.rstrip(';'): value for name, value in html5.items()}
+# Numeric references in the C1 range are read as Windows-1252, as browsers do
+_WINDOWS_1252 = {
+    number: bytes([number]).decode('cp1252')
+    for number in range(0x80, 0xa0)
+    if number not in (0x81, 0x8d, 0x8f, 0x90, 0x9d)
+}
+
+
+def _numeric_reference(name):
+    """Text for a numeric character reference body such as '8217' or 'x2019'"""
+    base, digits = (16, name[1:]) if name[:1] in ('x', 'X') else (10, name)
+    valid = '0123456789abcdefABCDEF' if base == 16 else '0123456789'
+    end = 0
+    while end < len(digits) and digits[end] in valid:
+        end += 1
+    if end == 0:
+        return name
+
+    number = int(digits[:end], base)
+    if number == 0 or number > 0x10ffff or 0xd800 <= number <= 0xdfff:
+        character = '\ufffd'
+    else:
+        character = _WINDOWS_1252.get(number) or chr(number)
+    return character + digits[end:]
+
+
+class ParagraphCollector(HTMLParser):
+    """SAX-style parser that keeps only the text inside <p> elements
+
+    Mirrors how BeautifulSoup's html.parser tree builder nests tags (no implied end tags,
+    an end tag closes everything opened after its start tag) and merges text runs, so
+    joining the collected paragraphs gives the same string as
+    ' '.join(p.get_text() for p in soup.find_all('p')).
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.paragraphs = []
+        self._stack = []
+        self._open_paragraphs = []
+        self._hidden = 0
+        self._preserve_whitespace = 0
+        self._run = []
+        # Empty elements opened as <br> rather than <br/>; a later </br> is swallowed once
+        self._already_closed = []
+
+    def _flush(self, cdata=None):
+        """End the current text run (or add a CDATA section) and hand it to the open paragraphs"""
+        text = ''.join(self._run) if cdata is None else cdata
+        self._run = []
+        if not text or not self._open_paragraphs or (self._hidden and cdata is None):
+            return
+        if not self._preserve_whitespace and not text.strip(_ASCII_SPACES):
+            # Whitespace-only runs collapse to a single newline or space, as in BeautifulSoup
+            text = '\n' if '\n' in text else ' '
+        for paragraph in self._open_paragraphs:
+            paragraph.append(text)
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag in EMPTY_ELEMENTS:
+            self._already_closed.append(tag)
+            return
+        self._stack.append(tag)
+        if tag == 'p':
+            self._open_paragraphs.append([])
+            self.paragraphs.append(self._open_paragraphs[-1])
+        elif tag in HIDDEN_TEXT_ELEMENTS:
+            self._hidden += 1
+        elif tag in PRESERVE_WHITESPACE_ELEMENTS:
+            self._preserve_whitespace += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush()
+        if tag == 'p':
+            self.paragraphs.append([])
+
+    def handle_endtag(self, tag):
+        if tag in self._already_closed:
+            self._already_closed.remove(tag)
+            return
+        self._flush()
+        if tag not in self._stack:
+            return
+        while True:
+            closed = self._stack.pop()
+            if closed == 'p':
+                self._open_paragraphs.pop()
+            elif closed in HIDDEN_TEXT_ELEMENTS:
+                self._hidden -= 1
+            elif closed in PRESERVE_WHITESPACE_ELEMENTS:
+                self._preserve_whitespace -= 1
+            if closed == tag:
+                return
+
+    def handle_data(self, data):
+        if self._open_paragraphs:
+            self._run.append(data)
+
+    def handle_entityref(self, name):
+        self.handle_data(_ENTITIES.get(name, '&' + name))
+
+    def handle_charref(self, name):
+        self.handle_data(_numeric_reference(name))
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def unknown_decl(self, data):
+        self._flush()
+        # CDATA sections count as text even inside hidden elements
+        if data[:6].upper() == 'CDATA[':
+            self._flush(cdata=data[6:])
+
+    def close(self):
+        super().close()
+        self._flush()
+
+    def text(self):
+        """Space-joined paragraph text collected so far"""
+        return ' '.join(''.join(paragraph) for paragraph in self.paragraphs).strip()
+
+
+def extract_paragraphs_stream(html):
+    """Paragraph text via the streaming collector (html may be a string or an iterable of chunks)"""
+    collector = ParagraphCollector()
+    for chunk in ([html] if isinstance(html, str) else html):
+        collector.feed(chunk)
+    collector.close()
+    return collector.text()
+
+
+def extract_paragraphs_bs4(html):
+    """Paragraph text via a full BeautifulSoup tree (the original implementation)"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    paragraphs = soup.find_all('p')
+    content = ' '.join([p.get_text() for p in paragraphs])
+    return content.strip()
+
+
+def extract_paragraphs_lxml(html):
+    """Paragraph text via lxml (fastest; libxml2 closes unclosed <p> tags, so nesting can differ)"""
+    try:
+        import lxml.html
+    except ImportError:
+        raise ImportError("The 'lxml' extractor needs lxml: uv pip install lxml")
+
+    if not html.strip():
+        return ''
+    document = lxml.html.document_fromstring(html)
+    return ' '.join(p.text_content() for p in document.iter('p')).strip()
+
+
+EXTRACTORS = {
+    'stream': extract_paragraphs_stream,
+    'bs4': extract_paragraphs_bs4,
+    'lxml': extract_paragraphs_lxml,
+}
+
+
+def extract_paragraphs(html, extractor=None):
+    """Paragraph text with the named extractor (default: HTML_EXTRACTOR env var, else 'stream')"""
+    return EXTRACTORS[extractor or DEFAULT_EXTRACTOR](html)
+
+
+def extract_paragraphs_bytes(data, encoding, extractor=None):
+    """Decode a (capped) page body and extract it; picklable entry point for process pools"""
+    return extract_paragraphs(data.decode(encoding or 'utf-8', errors='replace'), extractor)
+
+
+@contextmanager
+def parse_pool(workers):
+    """Process pool that takes HTML parsing off the fetching threads (None when workers is 0)"""
+    if not workers:
+        yield None
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield pool
@@ -0,0 +1,199 @@
+"""
+Inference Pool
+Multi-process FinBERT inference for GPU-less servers: N worker processes, each with its own
+torch thread budget, sharing one copy of the model weights and fed batches from a queue
+"""
+
+import atexit
+import itertools
+import os
+import queue
+import threading
+
+import numpy as np
+
+import stage_metrics
+from batch_scheduler import schedule_batches, padding_stats
+from model_registry import FINBERT_MODEL_ID, get_model
+from sentiment_engines import (
+    DEFAULT_OVERLAP, LABELS, SentimentEngine, SentimentScores, aggregate_windows, logits_to_labels, window_features
+)
+
+
+def available_cores():
+    """CPU cores this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _worker_main(model, tokenizer, num_threads, tasks, results):
+    """Worker loop: pad a pre-tokenized batch, run the forward pass, send back the logits"""
+    import torch
+
+    torch.set_num_threads(num_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Already fixed by the parent before fork
+        pass
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        batch_id, features = task
+        try:
+            inputs = tokenizer.pad(features, return_tensors="pt")
+            with torch.inference_mode():
+                logits = model(**inputs).logits
+            results.put((batch_id, logits.float().numpy(), None))
+        except Exception as error:
+            results.put((batch_id, None, repr(error)))
+
+
+class FinBertPool:
+    """Pool of FinBERT worker processes sharing the model weights"""
+
+    def __init__(self, num_workers=None, threads_per_worker=None, start_method=None):
+        cores = available_cores()
+        self.num_workers = num_workers or cores
+        self.threads_per_worker = threads_per_worker or max(1, cores // self.num_workers)
+        self.start_method = start_method
+        self._workers = []
+        self._tasks = None
+        self._results = None
+        self._lock = threading.Lock()
+        self._batch_ids = itertools.count()
+
+    def start(self):
+        """Load the model once and start the workers"""
+        if self._workers:
+            return self
+
+        import torch.multiprocessing as mp
+
+        finbert = get_model('finbert')
+        if finbert.device.type != 'cpu':
+            raise ValueError("FinBertPool is meant for CPU-only hosts; use the 'finbert' engine on GPU")
+
+        # fork shares the weights copy-on-write; share_memory() keeps spawn from copying them too
+        finbert.model.share_memory()
+        # Workers only pad; keep the tokenizer from warning about parallelism across fork
+        os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+        start_method = self.start_method or ('fork' if 'fork' in mp.get_all_start_methods() else 'spawn')
+        context = mp.get_context(start_method)
+
+        self._tasks = context.Queue()
+        self._results = context.Queue()
+        self._workers = [
+            context.Process(
+                target=_worker_main,
+                args=(finbert.model, finbert.tokenizer, self.threads_per_worker, self._tasks, self._results),
+                daemon=True
+            )
+            for _ in range(self.num_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+        atexit.register(self.close)
+        return self
+
+    def close(self, timeout=10):
+        """Stop the workers (terminating any still busy after `timeout` seconds)"""
+        if not self._workers:
+            return
+        for _ in self._workers:
+            self._tasks.put(None)
+        for worker in self._workers:
+            worker.join(timeout=timeout)
+            if worker.is_alive():
+                worker.terminate()
+        self._workers = []
+
+    def predict_logits(self, encoded, batches, timeout=300):
+        """Logits for every pre-tokenized text, batches fanned out across the workers
+
+        A failed batch is raised only after every other batch of the call has come back, so no
+        stale results are left queued for the next call; on a timeout the workers are restarted.
+        """
+        self.start()
+        logits = np.zeros((len(encoded['input_ids']), len(LABELS)), dtype=np.float32)
+
+        with self._lock:
+            pending = {}
+            for batch in batches:
+                batch_id = next(self._batch_ids)
+                pending[batch_id] = batch
+                features = [{key: encoded[key][i] for key in encoded.keys()} for i in batch]
+                self._tasks.put((batch_id, features))
+
+            errors = []
+            while pending:
+                try:
+                    batch_id, batch_logits, error = self._results.get(timeout=timeout)
+                except queue.Empty:
+                    # Workers are stuck or dead: drop them with their queues, the next call starts fresh ones
+                    self.close(timeout=0)
+                    raise RuntimeError(f"Inference pool timed out with {len(pending)} batches outstanding")
+                if batch_id not in pending:
+                    continue
+                batch = pending.pop(batch_id)
+                if error is not None:
+                    errors.append(error)
+                else:
+                    logits[batch] = batch_logits
+            if errors:
+                raise RuntimeError(f"Inference pool worker failed on {len(errors)} batch(es): {errors[0]}")
+
+        return logits
+
+
+class FinBertPoolEngine(SentimentEngine):
+    """FinBERT spread across a pool of CPU worker processes"""
+
+    name = 'finbert-pool'
+    model_id = FINBERT_MODEL_ID
+
+    def __init__(self, num_workers=None, threads_per_worker=None, batch_size=32, max_tokens=4096):
+        self.pool = FinBertPool(num_workers, threads_per_worker)
+        self.batch_size = batch_size
+        self.max_tokens = max_tokens
+        self.last_batch_stats = None
+
+    def score_batch(self, texts, batch_size=None, max_tokens=None):
+        batch_size = batch_size or self.batch_size
+        max_tokens = max_tokens or self.max_tokens
+        if not texts:
+            return SentimentScores(np.zeros(0, dtype=np.int8), np.zeros(0, dtype=np.float32))
+
+        # Tokenize in the parent so batches can be bucketed by length before fan-out
+        with stage_metrics.stage('tokenize', len(texts)):
+            encoded = get_model('finbert').tokenizer(list(texts), truncation=True, max_length=512)
+            lengths = [len(ids) for ids in encoded['input_ids']]
+            batches = schedule_batches(lengths, max_tokens=max_tokens, max_batch_size=batch_size)
+
+        with stage_metrics.stage('forward', len(texts)):
+            logits = self.pool.predict_logits(encoded, batches)
+        self.last_batch_stats = padding_stats(lengths, batches, naive_batch_size=batch_size)
+        with stage_metrics.stage('post_process', len(texts)):
+            return logits_to_labels(logits)
+
+    def score_documents(self, texts, aggregate='mean', overlap=DEFAULT_OVERLAP, batch_size=None, max_tokens=None):
+        """Full-length scoring: overlapping 512-token windows of every document, fanned out across the workers"""
+        batch_size = batch_size or self.batch_size
+        max_tokens = max_tokens or self.max_tokens
+        if not texts:
+            return SentimentScores(np.zeros(0, dtype=np.int8), np.zeros(0, dtype=np.float32))
+
+        with stage_metrics.stage('tokenize', len(texts)):
+            features, owners, lengths = window_features(get_model('finbert').tokenizer, texts, 512, overlap)
+            batches = schedule_batches(lengths, max_tokens=max_tokens, max_batch_size=batch_size)
+
+        with stage_metrics.stage('forward', len(lengths)):
+            logits = self.pool.predict_logits(features, batches)
+        self.last_batch_stats = padding_stats(lengths, batches, naive_batch_size=batch_size)
+        with stage_metrics.stage('post_process', len(texts)):
+            return aggregate_windows(logits, owners, len(texts), lengths, aggregate)
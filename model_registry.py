@@ -0,0 +1,95 @@
+"""
+Model Registry
+Process-wide sentiment models (FinBERT, VADER, TextBlob), each loaded on first use and shared
+"""
+
+import threading
+from collections import namedtuple
+
+FINBERT_MODEL_ID = "yiyanghkust/finbert-tone"
+
+FinBert = namedtuple('FinBert', ['model', 'tokenizer', 'device'])
+
+_loaders = {}
+_instances = {}
+_lock = threading.RLock()
+_device = None
+
+
+def register_loader(name, loader):
+    """Register a zero-argument loader for a model name"""
+    _loaders[name] = loader
+
+
+def get_model(name):
+    """Shared instance of a registered model, loaded on first use"""
+    instance = _instances.get(name)
+    if instance is not None:
+        return instance
+
+    with _lock:
+        if name not in _instances:
+            if name not in _loaders:
+                raise KeyError(f"Unknown model '{name}' (available: {', '.join(sorted(_loaders))})")
+            _instances[name] = _loaders[name]()
+        return _instances[name]
+
+
+def warm_up(*names):
+    """Load models ahead of time (all registered models if none are given)"""
+    for name in names or sorted(_loaders):
+        get_model(name)
+
+
+def is_loaded(name):
+    """Whether a model has already been loaded in this process"""
+    return name in _instances
+
+
+def unload(name):
+    """Drop a loaded model so the next get_model reloads it"""
+    with _lock:
+        _instances.pop(name, None)
+
+
+def get_device():
+    """Torch device used for transformer models (GPU if available)"""
+    global _device
+    if _device is None:
+        import torch
+
+        with _lock:
+            if _device is None:
+                _device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+                print(f"🚀 Using device: {_device}")
+                if torch.cuda.is_available():
+                    print(f"   GPU: {torch.cuda.get_device_name(0)}")
+                    print(f"   VRAM: {torch.cuda.get_device_properties(0).total_memory / 1e9:.1f} GB\n")
+    return _device
+
+
+def _load_finbert():
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    device = get_device()
+    model = AutoModelForSequenceClassification.from_pretrained(FINBERT_MODEL_ID).to(device)
+    model.eval()
+    tokenizer = AutoTokenizer.from_pretrained(FINBERT_MODEL_ID)
+    return FinBert(model, tokenizer, device)
+
+
+def _load_vader():
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+    return SentimentIntensityAnalyzer()
+
+
+def _load_textblob():
+    from textblob.en.sentiments import PatternAnalyzer
+
+    return PatternAnalyzer()
+
+
+register_loader('finbert', _load_finbert)
+register_loader('vader', _load_vader)
+register_loader('textblob', _load_textblob)
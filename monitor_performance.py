@@ -6,7 +6,13 @@ Shows live metrics while processing articles
 import time
 import sys
 from datetime import datetime
-from sentiment_analysis import fetch_news, analyze_sentiment
+from sentiment_analysis import analyze_sentiment
+from news_fetcher import NEWS_CORPUS, NEWS_CORPUS_MODE, fetch_news_many, published_epoch
+from dedup import dedupe_articles
+from model_registry import warm_up
+from sentiment_engines import LABEL_INDEX
+from sentiment_index import SentimentIndex, print_signals
+from stage_metrics import LatencyHistogram, print_snapshot
 
 
 class PerformanceMonitor:
@@ -15,12 +21,13 @@ class PerformanceMonitor:
     def __init__(self):
         self.start_time = None
         self.article_count = 0
-        self.timings = []
+        self.timings = LatencyHistogram()
         self.sentiments = {'Positive': 0, 'Negative': 0, 'Neutral': 0}
+        self.index = SentimentIndex()
 
     def start(self):
         """Start monitoring"""
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()
         self.clear_screen()
         print("🚀 Starting News Sentiment Analysis with Performance Monitoring")
         print("=" * 80)
@@ -30,19 +37,20 @@ class PerformanceMonitor:
         # Use print newlines instead of os.system for cross-platform
         print("\n" * 2)
 
-    def update(self, article_title, sentiment, score, elapsed):
-        """Update metrics with new article analysis"""
+    def update(self, article_title, sentiment, score, elapsed, published=None):
+        """Update metrics with new article analysis (published: the feed's RSS date string)"""
         self.article_count += 1
-        self.timings.append(elapsed * 1000)  # Convert to ms
+        self.timings.record(int(elapsed * 1e9))
         self.sentiments[sentiment] += 1
+        self.index.add(LABEL_INDEX[sentiment], score, published_epoch(published))
 
         # Display live stats
         self.display_dashboard(article_title, sentiment, score, elapsed)
 
     def display_dashboard(self, last_title, last_sentiment, last_score, last_time):
         """Display real-time dashboard"""
-        elapsed_total = time.time() - self.start_time
-        avg_time = sum(self.timings) / len(self.timings) if self.timings else 0
+        elapsed_total = time.perf_counter() - self.start_time
+        avg_time = self.timings.mean_ns / 1e6
         throughput = self.article_count / elapsed_total if elapsed_total > 0 else 0
 
         # Clear previous output (simple version)
@@ -92,7 +100,7 @@ class PerformanceMonitor:
 
     def summary(self):
         """Display final summary"""
-        elapsed_total = time.time() - self.start_time
+        elapsed_total = time.perf_counter() - self.start_time
 
         print("\n\n" + "=" * 80)
         print("📊 FINAL PERFORMANCE SUMMARY")
@@ -101,9 +109,10 @@ class PerformanceMonitor:
         print(f"\n⏱️  TIMING:")
         print(f"   Total Articles: {self.article_count}")
         print(f"   Total Time:     {elapsed_total:.2f}s")
-        print(f"   Average Time:   {sum(self.timings)/len(self.timings):.2f}ms per article")
-        print(f"   Fastest:        {min(self.timings):.2f}ms")
-        print(f"   Slowest:        {max(self.timings):.2f}ms")
+        print(f"   Average Time:   {self.timings.mean_ns / 1e6:.2f}ms per article")
+        print(f"   p50 / p99:      {self.timings.percentile(50) / 1e6:.2f}ms / {self.timings.percentile(99) / 1e6:.2f}ms")
+        print(f"   Fastest:        {(self.timings.min_ns or 0) / 1e6:.2f}ms")
+        print(f"   Slowest:        {self.timings.max_ns / 1e6:.2f}ms")
         print(f"   Throughput:     {self.article_count/elapsed_total:.1f} articles/sec")
 
         print(f"\n💭 SENTIMENT BREAKDOWN:")
@@ -112,20 +121,11 @@ class PerformanceMonitor:
             pct = (count / total * 100) if total > 0 else 0
             print(f"   {sentiment}: {count} ({pct:.1f}%)")
 
-        # Market signal
-        positive_pct = (self.sentiments['Positive'] / total * 100) if total > 0 else 0
-        negative_pct = (self.sentiments['Negative'] / total * 100) if total > 0 else 0
-
+        # Market signal per publish-time window, read from the index without rescanning
         print(f"\n📈 MARKET SIGNAL:")
-        if positive_pct > 40:
-            signal = "🟢 BULLISH"
-        elif negative_pct > 35:
-            signal = "🔴 BEARISH"
-        else:
-            signal = "⚪ NEUTRAL"
+        print_signals(self.index)
 
-        print(f"   {signal}")
-        print(f"   Positive: {positive_pct:.1f}% | Negative: {negative_pct:.1f}%")
+        print_snapshot()
 
         print("\n" + "=" * 80)
 
@@ -143,24 +143,30 @@ def main():
     ]
 
     print(f"📡 Fetching articles for {len(queries)} queries...\n")
+    if NEWS_CORPUS:
+        print(f"   📼 {NEWS_CORPUS_MODE.capitalize()} corpus: {NEWS_CORPUS}/")
+
+    results = fetch_news_many(queries, num_articles=20)
+    for query, articles in zip(queries, results):
+        print(f"   ✓ Got {len(articles)} articles for '{query}'")
+
+    all_articles, dedup_report = dedupe_articles(queries, results, near_duplicates=True)
+    duplicates = sum(counts['duplicates'] for counts in dedup_report.values())
+    print(f"   ✓ Removed {duplicates} duplicate articles across queries")
 
-    all_articles = []
-    for query in queries:
-        print(f"   Fetching: '{query}'...")
-        articles = fetch_news(query, num_articles=20)
-        all_articles.extend(articles)
-        print(f"   ✓ Got {len(articles)} articles")
+    # Load FinBERT before timing starts
+    warm_up('finbert')
 
     print(f"\n📊 Starting analysis of {len(all_articles)} articles...\n")
     time.sleep(1)
 
     # Analyze with monitoring
     for article in all_articles:
-        start = time.time()
+        start = time.perf_counter()
         score, sentiment = analyze_sentiment(article['title'])
-        elapsed = time.time() - start
+        elapsed = time.perf_counter() - start
 
-        monitor.update(article['title'], sentiment, score, elapsed)
+        monitor.update(article['title'], sentiment, score, elapsed, article.get('published'))
 
         # Small delay to see the updates (remove in production)
         time.sleep(0.05)
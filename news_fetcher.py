@@ -0,0 +1,521 @@
+"""
+News Fetcher
+Concurrent Google News RSS and article fetching with per-host and overall request limits
+"""
+
+import codecs
+import os
+import sys
+import threading
+import time
+import zlib
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from contextlib import contextmanager
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import chain
+from urllib.parse import quote, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.compat import chardet
+from urllib3.util import make_headers
+
+import stage_metrics
+from html_extract import (
+    DEFAULT_EXTRACTOR, MAX_PAGE_BYTES, extract_paragraphs_bytes, extract_paragraphs_stream, parse_pool
+)
+
+# Concurrency defaults
+MAX_IN_FLIGHT = 16
+MAX_PER_HOST = 8
+REQUEST_TIMEOUT = 10
+
+# Offline corpus (see replay.py): NEWS_CORPUS=dir replays it, NEWS_CORPUS_MODE=record captures into it
+NEWS_CORPUS = os.environ.get("NEWS_CORPUS")
+NEWS_CORPUS_MODE = os.environ.get("NEWS_CORPUS_MODE", "replay")
+# QUERY_PLANNER=1 merges overlapping queries into fewer RSS requests (see query_planner.py). Off by
+# default: a merged feed that hits the result limit needs follow-up requests, and its stories are
+# attributed by keyword, so coverage is close to, not identical to, one request per query.
+# Corpora are always recorded and replayed one query per URL (replay.record never plans).
+PLAN_QUERIES = os.environ.get("QUERY_PLANNER", "0") == "1"
+
+
+class RequestLimiter:
+    """Caps in-flight requests per host and overall"""
+
+    def __init__(self, max_in_flight=MAX_IN_FLIGHT, max_per_host=MAX_PER_HOST):
+        self.max_in_flight = max_in_flight
+        self.max_per_host = max_per_host
+        self._total = threading.BoundedSemaphore(max_in_flight)
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host_semaphore(self, url):
+        """Get (or create) the semaphore for a URL's host"""
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._hosts[host]
+
+    @contextmanager
+    def slot(self, url):
+        """Hold a request slot for url (host slot first, so waiting never pins a global slot)"""
+        with self._host_semaphore(url), self._total:
+            yield
+
+
+# Shared limiter for one-off and lazy requests made outside a fetch_news_many call
+default_limiter = RequestLimiter()
+
+# Shared HTTP session (keep-alive connection pools per host)
+_session = None
+_session_lock = threading.Lock()
+
+# Conditional GET validators per feed URL: url -> (etag, last_modified, entries)
+_feed_cache = {}
+_feed_cache_lock = threading.Lock()
+
+
+def configure_session(max_per_host=MAX_PER_HOST, max_hosts=64):
+    """(Re)build the shared session with per-host connection pool limits"""
+    global _session
+
+    session = requests.Session()
+    # gzip/deflate always, plus br/zstd when brotli/zstandard are installed
+    session.headers.update({'Accept-Encoding': make_headers(accept_encoding=True)['accept-encoding']})
+    adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=max_per_host)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    if NEWS_CORPUS:
+        from replay import mount_corpus
+
+        mount_corpus(session, NEWS_CORPUS, NEWS_CORPUS_MODE)
+
+    with _session_lock:
+        old, _session = _session, session
+    if old is not None:
+        old.close()
+    return session
+
+
+def get_session():
+    """Shared pooled HTTP session used for feeds and articles"""
+    if _session is None:
+        with _session_lock:
+            if _session is not None:
+                return _session
+        return configure_session()
+    return _session
+
+
+def build_rss_url(query):
+    """Google News RSS search URL for a query"""
+    return f"https://news.google.com/rss/search?q={quote(query)}"
+
+
+def fetch_feed(rss_url, limiter=None, timeout=REQUEST_TIMEOUT):
+    """Fetch and parse an RSS feed, returns its entries (empty on failure)
+
+    Sends If-None-Match / If-Modified-Since from the previous response, so an
+    unchanged feed costs a 304 and reuses the already parsed entries.
+    """
+    limiter = limiter or default_limiter
+    with _feed_cache_lock:
+        etag, last_modified, cached_entries = _feed_cache.get(rss_url, (None, None, None))
+
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+
+    try:
+        with limiter.slot(rss_url), stage_metrics.stage('rss_fetch'):
+            response = get_session().get(rss_url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and cached_entries is not None:
+            stage_metrics.count('rss_not_modified')
+            return cached_entries
+        response.raise_for_status()
+    except requests.RequestException:
+        stage_metrics.count('rss_errors')
+        return []
+
+    import feedparser
+
+    with stage_metrics.stage('rss_parse'):
+        entries = feedparser.parse(response.content).entries
+    stage_metrics.count('rss_entries', len(entries))
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if etag or last_modified:
+        with _feed_cache_lock:
+            _feed_cache[rss_url] = (etag, last_modified, entries)
+    return entries
+
+
+def _capped_chunks(response, max_bytes, chunk_size=65536, waited=None):
+    """Body chunks of a streamed response, stopping after max_bytes
+
+    Time spent waiting on the network is added to waited[0] (ns), so interleaved
+    download and parsing can be reported as separate stages.
+    """
+    remaining = max_bytes
+    chunks = iter(response.iter_content(chunk_size))
+    while remaining > 0:
+        start = time.perf_counter_ns()
+        chunk = next(chunks, None)
+        if waited is not None:
+            waited[0] += time.perf_counter_ns() - start
+        if chunk is None:
+            return
+        chunk = chunk[:remaining]
+        remaining -= len(chunk)
+        yield chunk
+
+
+def _codec(encoding):
+    """Normalized codec name, None if unknown"""
+    try:
+        return codecs.lookup(encoding).name if encoding else None
+    except LookupError:
+        return None
+
+
+def fetch_article_content(url, limiter=None, timeout=REQUEST_TIMEOUT, extractor=None,
+                          max_bytes=MAX_PAGE_BYTES, pool=None):
+    """Download an article page (at most max_bytes of it) and join the text of its <p> tags
+
+    The default 'stream' extractor parses chunks as they arrive without building a tree;
+    with a process pool the capped body is parsed there instead of on the calling thread.
+    """
+    extractor = extractor or DEFAULT_EXTRACTOR
+    limiter = limiter or default_limiter
+    waited = [0]
+    try:
+        with limiter.slot(url):
+            start = time.perf_counter_ns()
+            with get_session().get(url, timeout=timeout, stream=True) as response:
+                waited[0] = time.perf_counter_ns() - start
+                response.raise_for_status()
+                chunks = _capped_chunks(response, max_bytes, waited=waited)
+                encoding = _codec(response.encoding)
+                if extractor == 'stream' and encoding and pool is None:
+                    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+                    text_chunks = chain((decoder.decode(chunk) for chunk in chunks), [decoder.decode(b'', final=True)])
+                    text = extract_paragraphs_stream(text_chunks)
+                    stage_metrics.record('article_download', waited[0])
+                    stage_metrics.record('html_parse', time.perf_counter_ns() - start - waited[0])
+                    return text
+                data = b''.join(chunks)
+            stage_metrics.record('article_download', waited[0])
+    except requests.RequestException:
+        stage_metrics.count('article_errors')
+        return "Content not retrieved."
+
+    # No charset in the headers: detect it, as response.text would
+    with stage_metrics.stage('html_parse'):
+        if encoding is None and chardet is not None:
+            encoding = _codec(chardet.detect(data)['encoding'])
+        if pool is not None:
+            return pool.submit(extract_paragraphs_bytes, data, encoding, extractor).result()
+        return extract_paragraphs_bytes(data, encoding, extractor)
+
+
+def _safe_result(future, default):
+    """Result of a finished future, or default if the task raised"""
+    try:
+        return future.result()
+    except Exception:
+        return default
+
+
+# Pages at least this long are kept zlib-compressed on the article until read
+COMPRESS_CONTENT_OVER = 512
+
+
+class Article:
+    """Compact article record: fixed slots, interned query/source, compressed content
+
+    Reads like the dict it replaces (article['title'], .get, .pop, 'content' in article).
+    'content' is downloaded the first time it is read, kept compressed while stored, and
+    `del article['content']` / `.pop('content')` releases it once the article is scored.
+    """
+
+    __slots__ = ('id', 'title', 'link', 'published', 'source', 'query', '_content')
+    FIELDS = ('id', 'title', 'link', 'published', 'source', 'query')
+
+    def __init__(self, id='', title='', link='', published='', source='', query='', content=None):
+        self.id = id
+        self.title = title
+        self.link = link
+        self.published = published
+        # The same few queries and outlets repeat across thousands of articles
+        self.source = sys.intern(source)
+        self.query = sys.intern(query) if isinstance(query, str) else query
+        self._content = None
+        if content is not None:
+            self['content'] = content
+
+    def _load_content(self):
+        content = self._content
+        if content is None:
+            return None
+        return zlib.decompress(content).decode('utf-8') if isinstance(content, bytes) else content
+
+    def __getitem__(self, key):
+        if key == 'content':
+            content = self._load_content()
+            if content is None:
+                content = fetch_article_content(self.link)
+                self['content'] = content
+            return content
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key == 'content':
+            self._content = zlib.compress(value.encode('utf-8'), 1) if len(value) >= COMPRESS_CONTENT_OVER else value
+        elif key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            raise KeyError(key)
+
+    def __delitem__(self, key):
+        if key != 'content' or self._content is None:
+            raise KeyError(key)
+        self._content = None
+
+    def __contains__(self, key):
+        """'content' is only "in" the article once it has been downloaded"""
+        return key in self.FIELDS or (key == 'content' and self._content is not None)
+
+    def get(self, key, default=None):
+        if key == 'content' or key in self.FIELDS:
+            return self[key]
+        return default
+
+    def pop(self, key, *default):
+        """Remove and return 'content' without downloading it (other fields cannot be removed)"""
+        if key == 'content' and self._content is not None:
+            content = self._load_content()
+            self._content = None
+            return content
+        if default:
+            return default[0]
+        raise KeyError(key)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def keys(self):
+        return list(self.FIELDS) + (['content'] if self._content is not None else [])
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.FIELDS) + (self._content is not None)
+
+    def items(self):
+        return [(key, self._load_content() if key == 'content' else getattr(self, key)) for key in self.keys()]
+
+    def __eq__(self, other):
+        if isinstance(other, (Article, dict)):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Article(title={self.title!r}, query={self.query!r}, source={self.source!r})"
+
+
+def published_epoch(published):
+    """Unix time of an RSS 'published' date (RFC 822), None if missing or unparseable"""
+    if not published:
+        return None
+    try:
+        parsed = parsedate_to_datetime(published)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        # '-0000' means UTC with no known local offset
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def article_from_entry(item, query):
+    """Article record for one parsed feed entry"""
+    return Article(
+        id=item.get('id') or item.link,
+        title=item.title,
+        link=item.link,
+        published=item.get('published', ''),
+        source=item.get('source', {}).get('title', ''),
+        query=query
+    )
+
+
+def prefetch_content(articles, max_in_flight=MAX_IN_FLIGHT, max_per_host=MAX_PER_HOST, limiter=None,
+                     parse_workers=0):
+    """Resolve 'content' for many articles concurrently (already fetched ones are skipped)
+
+    parse_workers > 0 parses pages in that many processes instead of on the fetching threads.
+    """
+    limiter = limiter or RequestLimiter(max_in_flight, max_per_host)
+    pending = [article for article in articles if 'content' not in article]
+
+    with parse_pool(parse_workers) as pool, ThreadPoolExecutor(max_workers=limiter.max_in_flight) as executor:
+        futures = [
+            executor.submit(fetch_article_content, article['link'], limiter, pool=pool)
+            for article in pending
+        ]
+        for article, future in zip(pending, futures):
+            article['content'] = _safe_result(future, "Content not retrieved.")
+
+    return articles
+
+
+def plan_requests(queries, num_articles=10, plan=None):
+    """Planned RSS requests for logical queries: merged by query_planner, or one per query with plan=False"""
+    from query_planner import PlannedRequest, plan_queries
+
+    if plan is None:
+        plan = PLAN_QUERIES
+    if not plan:
+        return [PlannedRequest(query, (query,)) for query in dict.fromkeys(queries)]
+    return plan_queries(queries, num_articles)
+
+
+def fetch_planned(request, num_articles=10, limiter=None):
+    """Fetch one planned request, returns (query -> feed entries (at most num_articles each), short queries)
+
+    Short queries are those with fewer than num_articles full matches in a merged feed that hit the
+    result limit; they are left out of the mapping and need a request of their own.
+    """
+    from query_planner import attribute, starved
+
+    entries = fetch_feed(build_rss_url(request.expression), limiter)
+    if len(request.queries) == 1:
+        return {request.queries[0]: entries[:num_articles]}, []
+
+    stage_metrics.count('rss_merged_queries', len(request.queries))
+    attributed, matched = attribute(entries, request.queries, num_articles)
+    short = starved(matched, entries, num_articles)
+    stage_metrics.count('rss_planner_fallbacks', len(short))
+    for query in short:
+        del attributed[query]
+    return attributed, short
+
+
+def _planned_feeds(executor, requests, num_articles, limiter, window):
+    """Yield (query, entries) as planned requests finish; short queries go back to the executor as their own requests"""
+    from query_planner import PlannedRequest
+
+    def fetch(request):
+        return fetch_planned(request, num_articles, limiter)
+
+    followups = deque()
+    for _, (attributed, short) in _completed_in_window(executor, fetch, requests, window, ({}, []), followups):
+        followups.extend(PlannedRequest(query, (query,)) for query in short)
+        yield from attributed.items()
+
+
+def fetch_news_many(queries, num_articles=10, fetch_content=False,
+                    max_in_flight=MAX_IN_FLIGHT, max_per_host=MAX_PER_HOST, state=None, parse_workers=0, plan=None):
+    """Fetch several queries concurrently, returns one article list per query in query order
+
+    With fetch_content=False (title-only scans) only the feeds are requested and each
+    article's 'content' is downloaded lazily if and when it is read. With a FeedState,
+    only entries not seen by an earlier scan are returned (and have content fetched).
+    With plan=True (default: PLAN_QUERIES) overlapping queries share merged RSS requests.
+    """
+    limiter = RequestLimiter(max_in_flight, max_per_host)
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        by_query = dict(_planned_feeds(
+            executor, plan_requests(queries, num_articles, plan), num_articles, limiter, max_in_flight
+        ))
+        feeds = [by_query.get(query, []) for query in queries]
+
+    results = [
+        [article_from_entry(item, query) for item in items]
+        for query, items in zip(queries, feeds)
+    ]
+    if state is not None:
+        results = [state.new_articles(query, articles) for query, articles in zip(queries, results)]
+
+    if fetch_content:
+        # Every article page in parallel, a slow page only holds its own slot
+        prefetch_content([article for articles in results for article in articles], limiter=limiter,
+                         parse_workers=parse_workers)
+
+    return results
+
+
+def _completed_in_window(executor, func, items, window, default, followups=None):
+    """Yield (item, result) as tasks finish, never more than window tasks submitted at once
+
+    The consumer may append more items to the `followups` deque while iterating; they are
+    submitted ahead of the remaining items.
+    """
+    pending = {}
+    items = iter(items)
+    done_marker = object()
+    exhausted = False
+    while True:
+        while len(pending) < window:
+            if followups:
+                item = followups.popleft()
+            elif exhausted:
+                break
+            else:
+                item = next(items, done_marker)
+                if item is done_marker:
+                    exhausted = True
+                    continue
+            pending[executor.submit(func, item)] = item
+        if not pending:
+            return
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield pending.pop(future), _safe_result(future, default)
+
+
+def iter_news(queries, num_articles=10, max_in_flight=MAX_IN_FLIGHT, max_per_host=MAX_PER_HOST, limiter=None,
+              plan=None):
+    """Yield articles feed by feed as each planned RSS response arrives ('content' stays lazy)"""
+    limiter = limiter or RequestLimiter(max_in_flight, max_per_host)
+
+    planned = plan_requests(queries, num_articles, plan)
+    with ThreadPoolExecutor(max_workers=limiter.max_in_flight) as executor:
+        for query, items in _planned_feeds(executor, planned, num_articles, limiter, limiter.max_in_flight):
+            for item in items:
+                yield article_from_entry(item, query)
+
+
+def iter_content(articles, max_in_flight=MAX_IN_FLIGHT, max_per_host=MAX_PER_HOST, limiter=None):
+    """Yield articles with 'content' resolved, in completion order, at most max_in_flight downloads pending"""
+    limiter = limiter or RequestLimiter(max_in_flight, max_per_host)
+
+    def fetch(article):
+        if 'content' not in article:
+            article['content'] = fetch_article_content(article['link'], limiter)
+        return article
+
+    with ThreadPoolExecutor(max_workers=limiter.max_in_flight) as executor:
+        for article, _ in _completed_in_window(executor, fetch, articles, limiter.max_in_flight, None):
+            article.setdefault('content', "Content not retrieved.")
+            yield article
+
+
+def fetch_news(query, num_articles=10, fetch_content=False,
+               max_in_flight=MAX_IN_FLIGHT, max_per_host=MAX_PER_HOST):
+    """Fetch up to num_articles articles for a single query"""
+    return fetch_news_many([query], num_articles, fetch_content, max_in_flight, max_per_host)[0]
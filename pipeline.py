@@ -0,0 +1,134 @@
+"""
+Streaming Pipeline
+fetch -> dedupe -> batch -> score -> aggregate as chained generators: results come out per
+micro-batch, and memory is bounded by the batch size rather than the number of articles
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from batch_scheduler import add_padding_stats
+from dedup import ArticleDeduplicator
+from news_fetcher import MAX_IN_FLIGHT, MAX_PER_HOST, RequestLimiter, iter_content, iter_news
+from sentiment_engines import LABELS, label_distribution
+
+# One scored micro-batch plus the running aggregate after it
+ScoredBatch = namedtuple('ScoredBatch', ['articles', 'scores', 'aggregate'])
+
+
+class SentimentAggregate:
+    """Running label counts, score sums and padding stats over everything scored so far"""
+
+    def __init__(self):
+        self.counts = np.zeros(len(LABELS), dtype=np.int64)
+        self.score_sum = 0.0
+        self.num_articles = 0
+        self.num_batches = 0
+        self.padding_stats = None
+
+    def update(self, scores, stats=None):
+        """Fold one micro-batch of SentimentScores into the totals"""
+        self.counts += label_distribution(scores.label_indices)
+        self.score_sum += float(scores.scores.sum(dtype=np.float64))
+        self.num_articles += len(scores.scores)
+        self.num_batches += 1
+        self.padding_stats = add_padding_stats(self.padding_stats, stats)
+        return self
+
+    def distribution(self):
+        """Label -> count"""
+        return dict(zip(LABELS, self.counts.tolist()))
+
+    def mean_score(self):
+        return self.score_sum / self.num_articles if self.num_articles else 0.0
+
+
+def dedupe_stream(articles, deduplicator=None, near_duplicates=False, max_distance=6):
+    """Drop articles already seen (only link/title keys are kept, never the articles)"""
+    if deduplicator is None:
+        deduplicator = ArticleDeduplicator(near_duplicates=near_duplicates, max_distance=max_distance)
+    for article in articles:
+        if deduplicator.add(article):
+            yield article
+
+
+def micro_batches(items, batch_size):
+    """Group a stream into lists of up to batch_size items"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def score_stream(batches, engine=None, field='title', max_tokens=4096, use_cache=True, release_content=True,
+                 aggregate=None):
+    """Score each micro-batch of articles as it arrives, yields (articles, SentimentScores, padding stats)
+
+    With an aggregate ('mean', 'length' or 'max'), texts are scored as whole documents
+    (overlapping windows, see score_documents) instead of being truncated.
+    """
+    from sentiment_scoring import score_documents, score_sentiments
+
+    for articles in batches:
+        texts = [article[field] for article in articles]
+        if aggregate is not None:
+            scores, stats = score_documents(texts, engine=engine, aggregate=aggregate, batch_size=len(articles),
+                                            max_tokens=max_tokens, return_stats=True)
+        else:
+            scores, stats = score_sentiments(texts, engine=engine, batch_size=len(articles), max_tokens=max_tokens,
+                                             return_stats=True, use_cache=use_cache)
+        del texts
+        if release_content:
+            # Scraped pages are the bulk of an article's memory; drop them once scored
+            for article in articles:
+                article.pop('content', None)
+        yield articles, scores, stats
+
+
+def persist_stream(scored, store, engine=None):
+    """Bulk-append each scored micro-batch to a ResultsStore on its way through"""
+    from sentiment_scoring import DEFAULT_ENGINE
+    from sentiment_engines import get_engine
+
+    engine_name = get_engine(engine or DEFAULT_ENGINE).name
+    for articles, scores, stats in scored:
+        store.append(articles, scores, engine_name)
+        yield articles, scores, stats
+
+
+def aggregate_stream(scored, aggregate=None):
+    """Fold scored micro-batches into a running aggregate, yields a ScoredBatch per micro-batch"""
+    aggregate = aggregate or SentimentAggregate()
+    for articles, scores, stats in scored:
+        yield ScoredBatch(articles, scores, aggregate.update(scores, stats))
+
+
+def stream_sentiments(queries, num_articles=10, engine=None, batch_size=32, field='title',
+                      near_duplicates=True, deduplicator=None, max_in_flight=MAX_IN_FLIGHT,
+                      max_per_host=MAX_PER_HOST, use_cache=True, release_content=True, store=None,
+                      aggregate='mean'):
+    """Run the full pipeline over queries, yields a ScoredBatch as soon as each micro-batch is scored
+
+    With field='content', article pages are downloaded after deduplication, at most
+    max_in_flight at a time, so only the pages of the current micro-batch are held.
+    Content is scored in full (overlapping windows combined by `aggregate`; None truncates
+    at 512 tokens). With a ResultsStore, every scored micro-batch is also appended to it.
+    """
+    limiter = RequestLimiter(max_in_flight, max_per_host)
+
+    articles = iter_news(queries, num_articles, limiter=limiter)
+    articles = dedupe_stream(articles, deduplicator, near_duplicates=near_duplicates)
+    if field == 'content':
+        articles = iter_content(articles, limiter=limiter)
+
+    batches = micro_batches(articles, batch_size)
+    scored = score_stream(batches, engine=engine, field=field, use_cache=use_cache,
+                          release_content=release_content, aggregate=aggregate if field == 'content' else None)
+    if store is not None:
+        scored = persist_stream(scored, store, engine)
+    return aggregate_stream(scored)
@@ -0,0 +1,198 @@
+"""
+Query Planner
+Collapses overlapping logical queries into fewer OR-merged Google News RSS searches, kept
+under URL / term / result limits, and attributes the merged feeds' entries back to the
+logical queries they match
+"""
+
+import argparse
+import re
+from collections import namedtuple
+from urllib.parse import quote
+
+# Search URL ceiling (well under what Google and proxies accept) and query words Google honours
+MAX_URL_LENGTH = 2000
+MAX_QUERY_TERMS = 32
+# Entries one RSS search returns at most
+FEED_RESULT_LIMIT = 100
+
+RSS_SEARCH_URL = "https://news.google.com/rss/search?q="
+
+# One RSS request: its search expression and the logical queries it answers
+PlannedRequest = namedtuple('PlannedRequest', ['expression', 'queries'])
+
+_WORD = re.compile(r"\w+")
+# Queries that already use search syntax are sent as written, never merged
+_OPERATORS = re.compile(r"\bOR\b|\bAND\b|[()\"]|(?:^|\s)-\w|\w:")
+
+
+def terms(text):
+    """Lowercase word set of a query or entry text"""
+    return set(_WORD.findall(text.lower()))
+
+
+def mergeable(query):
+    """Plain keyword queries can be OR-merged; ones with operators, phrases or site: filters cannot"""
+    return bool(_WORD.search(query)) and not _OPERATORS.search(query)
+
+
+def search_url(expression):
+    """RSS search URL for an expression (same form as news_fetcher.build_rss_url)"""
+    return RSS_SEARCH_URL + quote(expression)
+
+
+def _group(text):
+    return f"({text})" if ' ' in text else text
+
+
+def merged_expression(queries):
+    """One search expression matching any of the queries, shared words factored out
+
+    ['gold price', 'gold news'] -> 'gold (price OR news)'. A query whose words are all shared
+    is the broadest of the group, so the shared words alone cover the rest.
+    """
+    if len(queries) == 1:
+        return queries[0]
+    words = [query.split() for query in queries]
+    common = set.intersection(*(terms(query) for query in queries))
+    prefix = [word for word in words[0] if word.lower() in common]
+    prefix = [word for i, word in enumerate(prefix) if word.lower() not in {w.lower() for w in prefix[:i]}]
+
+    rests = []
+    for query_words in words:
+        rest = ' '.join(word for word in query_words if word.lower() not in common)
+        if not rest and prefix:
+            return ' '.join(prefix)
+        if rest.lower() not in {r.lower() for r in rests}:
+            rests.append(rest)
+    alternatives = ' OR '.join(_group(rest) for rest in rests)
+    if not prefix:
+        return alternatives
+    return ' '.join(prefix) + (f" ({alternatives})" if len(rests) > 1 else f" {alternatives}")
+
+
+def _fits(queries, max_url_length, max_terms):
+    expression = merged_expression(queries)
+    return len(search_url(expression)) <= max_url_length and len(expression.split()) <= max_terms
+
+
+def plan_queries(queries, num_articles=10, max_url_length=MAX_URL_LENGTH, max_terms=MAX_QUERY_TERMS,
+                 result_limit=FEED_RESULT_LIMIT):
+    """Group logical queries into as few RSS requests as the limits allow, returns [PlannedRequest]
+
+    A request takes at most result_limit // num_articles queries, so one feed can still hold
+    every member's full share. Queries join the open request whose shared words they have most
+    of (else start one); queries with search operators get a request of their own.
+    """
+    per_request = max(1, result_limit // max(1, num_articles))
+    groups = []
+    for query in dict.fromkeys(queries):
+        if not mergeable(query) or per_request == 1:
+            groups.append([query])
+            continue
+        # Only join a request whose shared words this query also has, so merged expressions stay factored
+        shared = {
+            id(group): len(terms(query) & set.intersection(*map(terms, group))) for group in groups
+            if len(group) < per_request and mergeable(group[0]) and _fits(group + [query], max_url_length, max_terms)
+        }
+        candidates = [group for group in groups if shared.get(id(group))]
+        if candidates:
+            max(candidates, key=lambda group: shared[id(group)]).append(query)
+        else:
+            groups.append([query])
+    return [PlannedRequest(merged_expression(group), tuple(group)) for group in groups]
+
+
+def attribute(entries, queries, num_articles=10):
+    """Split one merged feed back into query -> entries (at most num_articles each), plus full-match counts
+
+    An entry belongs to every query whose words all appear in its title / summary. An entry
+    matching none fully (the search also looks at text the feed does not carry) goes to one
+    query only: the least filled of those sharing most words with it, after the full matches.
+    Entries sharing no word with any query are dropped.
+    """
+    query_terms = {query: terms(query) for query in queries}
+    full = {query: [] for query in queries}
+    partial = {query: [] for query in queries}
+    for entry in entries:
+        text = terms(f"{entry.get('title', '')} {entry.get('summary', '')}")
+        matches = [query for query, words in query_terms.items() if words <= text]
+        for query in matches:
+            full[query].append(entry)
+        if matches:
+            continue
+        overlap = {query: len(words & text) for query, words in query_terms.items()}
+        best = max(overlap.values(), default=0)
+        if best:
+            tied = [query for query, n in overlap.items() if n == best]
+            target = min(tied, key=lambda query: len(full[query]) + len(partial[query]))
+            partial[target].append(entry)
+
+    attributed = {query: (full[query] + partial[query])[:num_articles] for query in queries}
+    matched = {query: len(full[query]) for query in queries}
+    return attributed, matched
+
+
+def starved(matched, entries, num_articles=10, result_limit=FEED_RESULT_LIMIT):
+    """Queries with fewer than num_articles full matches in a feed that hit the result limit
+
+    The feed may have cut off their own results, so they need a request of their own.
+    """
+    if len(entries) < result_limit:
+        return []
+    return [query for query, count in matched.items() if count < num_articles]
+
+
+def print_plan(plan, queries):
+    """One line per request: member queries, expression and URL length"""
+    print(f"{len(queries)} logical queries -> {len(plan)} RSS request(s)")
+    for request in plan:
+        print(f"   [{len(request.queries)}] {request.expression}  ({len(search_url(request.expression))} chars)")
+
+
+def main():
+    """Show the plan for a query list, optionally fetch it and compare against one request per query"""
+    parser = argparse.ArgumentParser(description="Plan merged Google News RSS requests for logical queries")
+    parser.add_argument("queries", nargs="*", default=[
+        "gold market", "gold price", "gold news", "gold trends", "gold analysis", "gold forecast", "gold investment"
+    ])
+    parser.add_argument("--num-articles", type=int, default=10)
+    parser.add_argument("--max-url-length", type=int, default=MAX_URL_LENGTH)
+    parser.add_argument("--fetch", action="store_true", help="fetch both ways and compare coverage")
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("Query Planner")
+    print("=" * 80)
+    plan = plan_queries(args.queries, args.num_articles, args.max_url_length)
+    print_plan(plan, args.queries)
+
+    if args.fetch:
+        import news_fetcher
+        import stage_metrics
+
+        stage_metrics.reset()
+        separate = news_fetcher.fetch_news_many(args.queries, args.num_articles, plan=False)
+        separate_requests = stage_metrics.snapshot()['stages'].get('rss_fetch', {}).get('count', 0)
+        stage_metrics.reset()
+        planned = news_fetcher.fetch_news_many(args.queries, args.num_articles, plan=True)
+        planned_requests = stage_metrics.snapshot()['stages'].get('rss_fetch', {}).get('count', 0)
+
+        print(f"\nFeed round-trips: {separate_requests} separate -> {planned_requests} planned\n")
+        print(f"{'Query':<24} {'Separate':>9} {'Planned':>8} {'Shared':>7}")
+        print("-" * 52)
+        for query, before, after in zip(args.queries, separate, planned):
+            shared = {article['link'] for article in before} & {article['link'] for article in after}
+            print(f"{query:<24} {len(before):>9} {len(after):>8} {len(shared):>7}")
+        links_before = {article['link'] for articles in separate for article in articles}
+        links_after = {article['link'] for articles in planned for article in articles}
+        print(f"\nDistinct stories: {len(links_before)} separate, {len(links_after)} planned, "
+              f"{len(links_before & links_after)} in both")
+
+    print("\n" + "=" * 80)
+    print("✅ Planning Complete!")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Record / Replay
+Captures RSS and article HTTP responses into a compressed on-disk corpus and serves them back,
+so fetch_news and fetch_article_content run deterministically and without network access
+"""
+
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from urllib3.response import HTTPResponse
+
+INDEX_FILE = "index.jsonl"
+BODIES_DIR = "bodies"
+
+# Headers describing the wire format; bodies are stored decoded, so these would be wrong on replay
+_DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'keep-alive'}
+_CONDITIONAL_HEADERS = ('If-None-Match', 'If-Modified-Since')
+
+
+def _body_name(url):
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()[:32] + '.gz'
+
+
+class ResponseCorpus:
+    """Directory of gzip-compressed response bodies plus a JSON-lines index keyed by URL"""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._lock = threading.Lock()
+        index_path = os.path.join(path, INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path, encoding='utf-8') as handle:
+                for line in handle:
+                    entry = json.loads(line)
+                    # Later lines win, so re-recording a URL replaces it
+                    self.entries[entry['url']] = entry
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, url):
+        """(status, headers, body bytes) for a URL, None if it was never recorded"""
+        entry = self.entries.get(url)
+        if entry is None:
+            return None
+        with gzip.open(os.path.join(self.path, BODIES_DIR, entry['body']), 'rb') as handle:
+            return entry['status'], entry['headers'], handle.read()
+
+    def put(self, url, status, headers, body):
+        """Store one response (body already content-decoded)"""
+        entry = {
+            'url': url,
+            'status': status,
+            'headers': {key: value for key, value in headers.items() if key.lower() not in _DROPPED_HEADERS},
+            'body': _body_name(url),
+            'size': len(body),
+            'recorded': time.time(),
+        }
+        with self._lock:
+            os.makedirs(os.path.join(self.path, BODIES_DIR), exist_ok=True)
+            with gzip.open(os.path.join(self.path, BODIES_DIR, entry['body']), 'wb') as handle:
+                handle.write(body)
+            with open(os.path.join(self.path, INDEX_FILE), 'a', encoding='utf-8') as handle:
+                handle.write(json.dumps(entry) + '\n')
+            self.entries[url] = entry
+
+    def stats(self):
+        """Entry count, raw and compressed sizes"""
+        compressed = sum(
+            os.path.getsize(os.path.join(self.path, BODIES_DIR, entry['body'])) for entry in self.entries.values()
+        )
+        return {
+            'entries': len(self.entries),
+            'feeds': sum('/rss/' in url for url in self.entries),
+            'raw_bytes': sum(entry['size'] for entry in self.entries.values()),
+            'compressed_bytes': compressed,
+        }
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Live HTTP adapter that also writes every response into a corpus"""
+
+    def __init__(self, corpus, **kwargs):
+        super().__init__(**kwargs)
+        self.corpus = corpus
+
+    def send(self, request, **kwargs):
+        # Always record full bodies, never a bare 304
+        for header in _CONDITIONAL_HEADERS:
+            request.headers.pop(header, None)
+        response = super().send(request, **kwargs)
+        self.corpus.put(request.url, response.status_code, dict(response.headers), response.content)
+        return response
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Adapter that answers only from a corpus (404 for anything not recorded)"""
+
+    def __init__(self, corpus, **kwargs):
+        super().__init__(**kwargs)
+        self.corpus = corpus
+        self.hits = 0
+        self.misses = 0
+
+    def send(self, request, stream=False, **kwargs):
+        recorded = self.corpus.get(request.url)
+        if recorded is None:
+            self.misses += 1
+            status, headers, body = 404, {'Content-Type': 'text/plain'}, b'not in replay corpus'
+        else:
+            self.hits += 1
+            status, headers, body = recorded
+
+        raw = HTTPResponse(
+            body=io.BytesIO(body), headers=headers, status=status,
+            preload_content=False, decode_content=False, request_url=request.url
+        )
+        response = self.build_response(request, raw)
+        if not stream:
+            response.content
+        return response
+
+
+def mount_corpus(session, path, mode='replay'):
+    """Route every request of a session through a corpus in 'record' or 'replay' mode"""
+    if mode not in ('record', 'replay'):
+        raise ValueError(f"Unknown corpus mode '{mode}' (use 'record' or 'replay')")
+    corpus = ResponseCorpus(path)
+    if mode == 'replay' and not len(corpus):
+        raise FileNotFoundError(f"No recorded responses in {path}; record one with: python replay.py record {path}")
+
+    adapter = (RecordingAdapter if mode == 'record' else ReplayAdapter)(corpus)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return adapter
+
+
+def record(path, queries, num_articles=20, fetch_content=True):
+    """Fetch queries (and their article pages) live, writing every response to the corpus
+
+    Feeds are recorded one URL per query (no query planning), the form replay asks for.
+    """
+    import news_fetcher
+
+    session = news_fetcher.configure_session()
+    mount_corpus(session, path, 'record')
+    try:
+        return news_fetcher.fetch_news_many(queries, num_articles, fetch_content=fetch_content, plan=False)
+    finally:
+        news_fetcher.configure_session()
+
+
+def main():
+    """Record a corpus or describe an existing one"""
+    parser = argparse.ArgumentParser(description="Record / inspect an offline news replay corpus")
+    parser.add_argument("command", choices=["record", "info"])
+    parser.add_argument("corpus", help="corpus directory")
+    parser.add_argument("--queries", nargs="*",
+                        default=["gold market", "gold price", "gold forecast", "gold news", "gold investment"])
+    parser.add_argument("--num-articles", type=int, default=20)
+    parser.add_argument("--no-content", action="store_true", help="record feeds only, not article pages")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        print(f"📼 Recording {len(args.queries)} queries into {args.corpus}/ ...")
+        results = record(args.corpus, args.queries, args.num_articles, fetch_content=not args.no_content)
+        print(f"   {sum(len(articles) for articles in results)} articles")
+
+    stats = ResponseCorpus(args.corpus).stats()
+    ratio = stats['raw_bytes'] / stats['compressed_bytes'] if stats['compressed_bytes'] else 0.0
+    print(f"Corpus {args.corpus}: {stats['entries']} responses ({stats['feeds']} feeds), "
+          f"{stats['raw_bytes'] / 1e6:.1f}MB raw, {stats['compressed_bytes'] / 1e6:.1f}MB on disk ({ratio:.1f}x)")
+    print(f"Replay with: NEWS_CORPUS={args.corpus} uv run python benchmark_comparison.py")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Results Store
+Append-only columnar store for scored articles: one raw NumPy column file per field, read
+back as memory maps, so months of scans load without parsing and filter without copying
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from dedup import canonicalize_link
+from news_fetcher import published_epoch
+from sentiment_engines import LABELS, label_distribution
+
+DEFAULT_STORE_PATH = "results_store"
+META_FILE = "meta.json"
+TITLES_FILE = "titles.bin"
+
+# Fixed-width columns (one little-endian file each); titles are UTF-8 bytes addressed by title_end
+COLUMNS = {
+    'link_hash': np.dtype('<u8'),
+    'published': np.dtype('<f8'),     # Unix time, NaN if the feed gave no parseable date
+    'query': np.dtype('<i4'),         # index into meta['queries']
+    'engine': np.dtype('<i2'),        # index into meta['engines']
+    'label': np.dtype('i1'),          # index into LABELS
+    'confidence': np.dtype('<f4'),
+    'title_end': np.dtype('<i8'),     # end offset of the title in titles.bin
+}
+
+
+def link_hash(link):
+    """64-bit hash of an article's canonical link"""
+    return int.from_bytes(hashlib.blake2b(canonicalize_link(link).encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class ResultsStore:
+    """Directory of append-only column files plus a small JSON manifest (row count, dictionaries)
+
+    The manifest is replaced atomically after every append, so it is the commit point: bytes
+    past the committed row count (an interrupted append) are truncated on open.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._maps = {}
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path) as handle:
+                self.meta = json.load(handle)
+        else:
+            self.meta = {'rows': 0, 'title_bytes': 0, 'queries': [], 'engines': []}
+        self._truncate_uncommitted()
+
+    def _file(self, name):
+        return os.path.join(self.path, f"{name}.bin")
+
+    def _truncate_uncommitted(self):
+        sizes = {name: self.meta['rows'] * dtype.itemsize for name, dtype in COLUMNS.items()}
+        sizes['titles'] = self.meta['title_bytes']
+        for name, size in sizes.items():
+            path = self._file(name)
+            if not os.path.exists(path):
+                open(path, 'wb').close()
+            if os.path.getsize(path) > size:
+                with open(path, 'r+b') as handle:
+                    handle.truncate(size)
+
+    def __len__(self):
+        return self.meta['rows']
+
+    def _ids(self, dictionary, values):
+        """Dictionary-encode strings, extending the dictionary with unseen ones"""
+        index = {value: i for i, value in enumerate(self.meta[dictionary])}
+        for value in values:
+            if value not in index:
+                index[value] = len(self.meta[dictionary])
+                self.meta[dictionary].append(value)
+        return [index[value] for value in values]
+
+    def append(self, articles, scores, engine):
+        """Bulk-append one scored batch (articles with title/link/published/query, SentimentScores)"""
+        if not len(articles):
+            return 0
+        titles = [article['title'].encode('utf-8') for article in articles]
+        with self._lock:
+            columns = {
+                'link_hash': np.fromiter((link_hash(article['link']) for article in articles),
+                                         dtype=COLUMNS['link_hash'], count=len(articles)),
+                'published': np.array([published_epoch(article.get('published')) for article in articles],
+                                      dtype=np.float64),
+                'query': np.array(self._ids('queries', [article.get('query', '') for article in articles]),
+                                  dtype=COLUMNS['query']),
+                'engine': np.full(len(articles), self._ids('engines', [engine])[0], dtype=COLUMNS['engine']),
+                'label': np.asarray(scores.label_indices, dtype=COLUMNS['label']),
+                'confidence': np.asarray(scores.scores, dtype=COLUMNS['confidence']),
+                'title_end': self.meta['title_bytes'] + np.cumsum([len(title) for title in titles], dtype=np.int64),
+            }
+            for name, values in columns.items():
+                with open(self._file(name), 'ab') as handle:
+                    handle.write(values.astype(COLUMNS[name], copy=False).tobytes())
+            with open(self._file('titles'), 'ab') as handle:
+                handle.write(b''.join(titles))
+
+            self.meta['rows'] += len(articles)
+            self.meta['title_bytes'] = int(columns['title_end'][-1])
+            self._commit()
+        return len(articles)
+
+    def _commit(self):
+        temporary = os.path.join(self.path, META_FILE + '.tmp')
+        with open(temporary, 'w') as handle:
+            json.dump(self.meta, handle)
+        os.replace(temporary, os.path.join(self.path, META_FILE))
+
+    def column(self, name):
+        """Read-only memory map of a column's committed rows (no copy, no parsing)"""
+        rows = self.meta['rows']
+        cached = self._maps.get(name)
+        if cached is not None and len(cached) == rows:
+            return cached
+        if rows == 0:
+            return np.zeros(0, dtype=COLUMNS[name])
+        mapped = np.memmap(self._file(name), dtype=COLUMNS[name], mode='r', shape=(rows,))
+        self._maps[name] = mapped
+        return mapped
+
+    def mask(self, query=None, engine=None, label=None, since=None, until=None, min_confidence=None):
+        """Boolean row mask for the given predicates (None means no constraint)"""
+        selected = np.ones(len(self), dtype=bool)
+        if query is not None:
+            ids = [self.meta['queries'].index(q) for q in _as_list(query) if q in self.meta['queries']]
+            selected &= np.isin(self.column('query'), ids)
+        if engine is not None:
+            ids = [self.meta['engines'].index(e) for e in _as_list(engine) if e in self.meta['engines']]
+            selected &= np.isin(self.column('engine'), ids)
+        if label is not None:
+            ids = [LABELS.index(l) if isinstance(l, str) else l for l in _as_list(label)]
+            selected &= np.isin(self.column('label'), ids)
+        if since is not None:
+            selected &= self.column('published') >= since
+        if until is not None:
+            selected &= self.column('published') < until
+        if min_confidence is not None:
+            selected &= self.column('confidence') >= min_confidence
+        return selected
+
+    def select(self, columns=None, **predicates):
+        """Columns for matching rows: memory maps when nothing is filtered, else just the matching rows"""
+        columns = columns or [name for name in COLUMNS if name != 'title_end'] + ['title']
+        rows = None if not any(value is not None for value in predicates.values()) else \
+            np.flatnonzero(self.mask(**predicates))
+        result = {}
+        for name in columns:
+            if name == 'title':
+                result[name] = self.titles(rows)
+            else:
+                data = self.column(name)
+                result[name] = data if rows is None else data[rows]
+        return result
+
+    def titles(self, rows=None):
+        """Decoded titles for row indices (all rows by default)"""
+        ends = self.column('title_end')
+        if rows is None:
+            rows = range(len(ends))
+        if not len(ends):
+            return []
+        data = np.memmap(self._file('titles'), dtype=np.uint8, mode='r', shape=(self.meta['title_bytes'],)) \
+            if self.meta['title_bytes'] else np.zeros(0, dtype=np.uint8)
+        return [bytes(data[(ends[row - 1] if row else 0):ends[row]]).decode('utf-8') for row in rows]
+
+    def names(self, dictionary, ids):
+        """Decode a dictionary column ('queries' or 'engines') back to strings"""
+        return [self.meta[dictionary][i] for i in np.asarray(ids).tolist()]
+
+
+def _as_list(value):
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+def print_store_summary(store, **predicates):
+    """Row counts and label split per query for the matching rows"""
+    selected = store.select(['query', 'label', 'confidence'], **predicates)
+    print(f"{store.path}/: {len(store)} rows, {len(selected['label'])} matching")
+    for query_id in np.unique(selected['query']):
+        rows = selected['query'] == query_id
+        counts = label_distribution(selected['label'][rows])
+        split = ', '.join(f"{label}: {n}" for label, n in zip(LABELS, counts.tolist()))
+        print(f"   {store.meta['queries'][query_id]}: {int(rows.sum())} ({split}) | "
+              f"mean confidence {float(selected['confidence'][rows].mean()):.2f}")
+
+
+def main():
+    """Summarize (and optionally filter) a results store"""
+    parser = argparse.ArgumentParser(description="Inspect the columnar scan results store")
+    parser.add_argument("store", nargs="?", default=DEFAULT_STORE_PATH)
+    parser.add_argument("--query", nargs="*", default=None)
+    parser.add_argument("--engine", default=None)
+    parser.add_argument("--label", choices=LABELS, default=None)
+    parser.add_argument("--days", type=float, default=None, help="only articles published in the last N days")
+    parser.add_argument("--min-confidence", type=float, default=None)
+    parser.add_argument("--show", type=int, default=10, help="matching titles to print")
+    args = parser.parse_args()
+
+    store = ResultsStore(args.store)
+    predicates = {
+        'query': args.query, 'engine': args.engine, 'label': args.label,
+        'since': time.time() - args.days * 86400 if args.days is not None else None,
+        'min_confidence': args.min_confidence,
+    }
+    print_store_summary(store, **predicates)
+
+    rows = np.flatnonzero(store.mask(**predicates))[-args.show:] if args.show else []
+    labels = store.column('label')
+    confidences = store.column('confidence')
+    for row, title in zip(rows, store.titles(rows)):
+        print(f"   [{LABELS[labels[row]]} {confidences[row]:.2f}] {title[:70]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Scanner Service
+Long-running asyncio scanner: every query polls its feed on its own jittered interval, only
+newly seen articles go to one shared batching inference worker, and rolling sentiment
+windows (by publish time) are kept per query
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import stage_metrics
+from dedup import ArticleDeduplicator
+from news_fetcher import (
+    MAX_IN_FLIGHT, MAX_PER_HOST, RequestLimiter, article_from_entry, build_rss_url, fetch_feed, published_epoch
+)
+from results_store import ResultsStore
+from sentiment_scoring import DEFAULT_ENGINE, label_names, score_sentiments
+from sentiment_engines import get_engine
+from sentiment_index import DEFAULT_WINDOWS, SentimentIndex, parse_window, print_signals
+
+DEFAULT_INTERVAL = 60
+DEFAULT_JITTER = 0.2
+
+
+class ScannerService:
+    """Polls many queries concurrently and scores new articles with one warm model"""
+
+    def __init__(self, queries, interval=DEFAULT_INTERVAL, jitter=DEFAULT_JITTER, num_articles=100,
+                 engine=None, batch_size=32, max_batch_wait=0.5, windows=DEFAULT_WINDOWS,
+                 near_duplicates=True, max_in_flight=MAX_IN_FLIGHT, max_per_host=MAX_PER_HOST,
+                 on_batch=None, store=None):
+        # queries: list of names, or {query: interval seconds} for per-query intervals
+        self.intervals = dict(queries) if isinstance(queries, dict) else {query: interval for query in queries}
+        self.jitter = jitter
+        self.num_articles = num_articles
+        self.engine = engine or DEFAULT_ENGINE
+        self.batch_size = batch_size
+        self.max_batch_wait = max_batch_wait
+        self.on_batch = on_batch
+        self.store = store  # optional ResultsStore every scored batch is appended to
+
+        self.limiter = RequestLimiter(max_in_flight, max_per_host)
+        # Per-query and overall sentiment over each window, keyed on publish time
+        self.index = SentimentIndex(windows)
+        # Seen articles are forgotten once they fall out of the longest window, so memory stays bounded.
+        # Each query dedupes on its own (its window counts every story it returned); the cross-query
+        # deduplicator only decides what counts toward the overall window. Identical titles from
+        # several queries are still scored once, through the sentiment cache.
+        self.near_duplicates = near_duplicates
+        self.query_deduplicators = {}
+        self.deduplicator = ArticleDeduplicator(near_duplicates=near_duplicates, max_age=self.index.horizon)
+
+        self.polls = 0
+        self.scored = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight)
+        self._queue = None
+        self._stopping = None
+
+    def _next_delay(self, query):
+        """Poll interval with +/- jitter, so feeds on the same interval drift apart"""
+        return self.intervals[query] * (1 + random.uniform(-self.jitter, self.jitter))
+
+    async def _poll(self, query):
+        """Fetch one query's feed forever, queueing only the articles not seen before"""
+        loop = asyncio.get_running_loop()
+        rss_url = build_rss_url(query)
+
+        # Stagger the first poll across the interval instead of hitting every feed at once
+        await self._sleep(random.uniform(0, self.intervals[query]))
+        while not self._stopping.is_set():
+            started = loop.time()
+            try:
+                await self._poll_once(query, rss_url)
+            except Exception as error:
+                # One bad feed or entry must not end this query's polling for the rest of the run
+                stage_metrics.count('poll_errors')
+                print(f"⚠️  Poll failed for '{query}': {error!r}")
+            await self._sleep(max(0.0, self._next_delay(query) - (loop.time() - started)))
+
+    async def _poll_once(self, query, rss_url):
+        """Fetch one query's feed once and queue its unseen articles"""
+        loop = asyncio.get_running_loop()
+        entries = await loop.run_in_executor(self._executor, fetch_feed, rss_url, self.limiter)
+        self.polls += 1
+
+        now = time.time()
+        for item in entries[:self.num_articles]:
+            try:
+                article = article_from_entry(item, query)
+            except (AttributeError, KeyError):
+                # An entry without a title or link: skip it, not the rest of the feed
+                stage_metrics.count('poll_bad_entries')
+                continue
+            published = published_epoch(article['published'])
+            if published is not None and published <= now - self.index.horizon:
+                # Too old for any window: skip instead of scoring it again after it was forgotten
+                continue
+            if self._query_deduplicator(query).add(article, now=now):
+                await self._queue.put((article, self.deduplicator.add(article, now=now)))
+
+    def _query_deduplicator(self, query):
+        deduplicator = self.query_deduplicators.get(query)
+        if deduplicator is None:
+            deduplicator = self.query_deduplicators[query] = ArticleDeduplicator(
+                near_duplicates=self.near_duplicates, max_age=self.index.horizon
+            )
+        return deduplicator
+
+    async def _sleep(self, seconds):
+        """Sleep that wakes early on stop()"""
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _next_batch(self):
+        """Wait for one queued (article, new across queries) pair, then gather more until batch_size or max_batch_wait
+
+        Returns (pairs, done); done is True once the shutdown sentinel (None) was read.
+        """
+        loop = asyncio.get_running_loop()
+        batch = []
+        item = await self._queue.get()
+        deadline = loop.time() + self.max_batch_wait
+        while item is not None:
+            batch.append(item)
+            timeout = deadline - loop.time()
+            if len(batch) >= self.batch_size or timeout <= 0:
+                return batch, False
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return batch, False
+        return batch, True
+
+    async def _infer(self):
+        """Shared inference worker: one batch at a time, off the event loop"""
+        loop = asyncio.get_running_loop()
+        done = False
+        while not done:
+            queued, done = await self._next_batch()
+            if not queued:
+                continue
+            articles = [article for article, _ in queued]
+            try:
+                scores = await loop.run_in_executor(
+                    None, score_sentiments, [article['title'] for article in articles], self.engine, self.batch_size
+                )
+            except Exception as error:
+                print(f"⚠️  Scoring failed for {len(articles)} articles: {error!r}")
+                continue
+            self._record(articles, scores, [overall for _, overall in queued])
+
+    def _record(self, articles, scores, overall):
+        """Fold a scored batch into the per-query index, and the overall one where `overall` is True"""
+        now = time.time()
+        for article, label_index, score, counted in zip(
+            articles, scores.label_indices.tolist(), scores.scores.tolist(), overall
+        ):
+            self.index.add(label_index, score, published_epoch(article['published']), article['query'], now,
+                           overall=counted)
+        self.scored += len(articles)
+        if self.store is not None:
+            self.store.append(articles, scores, get_engine(self.engine).name)
+
+        if self.on_batch is not None:
+            self.on_batch(articles, scores, self)
+
+    def snapshot(self, window=None):
+        """Current state of one window (the first by default): query -> (article count, distribution, mean score)"""
+        summaries = {query: self.index.summary(query, window) for query in self.intervals}
+        return {
+            query: (summary['count'], summary['distribution'], summary['mean_score'])
+            for query, summary in summaries.items()
+        }
+
+    def stop(self):
+        """Ask run() to return after the current polls"""
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def run(self, duration=None):
+        """Poll and score until stop() is called or duration seconds have passed"""
+        loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._stopping = asyncio.Event()
+
+        # Load the model once, before the first poll lands
+        await loop.run_in_executor(None, get_engine(self.engine).warm_up)
+
+        pollers = [asyncio.create_task(self._poll(query)) for query in self.intervals]
+        worker = asyncio.create_task(self._infer())
+        try:
+            if duration is None:
+                await self._stopping.wait()
+            else:
+                await self._sleep(duration)
+        finally:
+            self._stopping.set()
+            await asyncio.gather(*pollers, return_exceptions=True)
+            # Sentinel: the worker scores everything already queued, then returns
+            await self._queue.put(None)
+            await worker
+            self._executor.shutdown(wait=False)
+
+
+def print_batch(articles, scores, service):
+    """Default on_batch callback: one line per new article plus the rolling overall split"""
+    for article, sentiment, score in zip(articles, label_names(scores.label_indices), scores.scores.tolist()):
+        print(f"[{article['query']}] {sentiment:<8} {score:+.2f}  {article['title'][:70]}")
+    window = next(iter(service.index.windows))
+    distribution = ', '.join(f"{label}: {count}" for label, count in service.index.summary(None, window)['distribution'].items())
+    print(f"   ↳ {service.scored} scored, {service.polls} polls | published in last {window}: {distribution}")
+
+
+def main():
+    """Run the scanner service from the command line"""
+    parser = argparse.ArgumentParser(description="Continuous asyncio news sentiment scanner")
+    parser.add_argument("queries", nargs="*", default=["gold market", "gold price", "gold forecast"])
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="seconds between polls per query")
+    parser.add_argument("--jitter", type=float, default=DEFAULT_JITTER, help="+/- fraction of the interval")
+    parser.add_argument("--windows", nargs="*", default=list(DEFAULT_WINDOWS),
+                        help="rolling windows by publish time, e.g. 5m 1h 1d")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--engine", default=None)
+    parser.add_argument("--duration", type=float, default=None, help="stop after this many seconds")
+    parser.add_argument("--store", default=None, help="results store directory to append scored articles to")
+    args = parser.parse_args()
+
+    service = ScannerService(
+        args.queries, interval=args.interval, jitter=args.jitter,
+        windows={window: parse_window(window) for window in args.windows},
+        engine=args.engine, batch_size=args.batch_size, on_batch=print_batch,
+        store=ResultsStore(args.store) if args.store else None
+    )
+    print(f"📡 Scanning {len(args.queries)} queries every ~{args.interval:.0f}s with {service.engine}")
+    try:
+        with stage_metrics.scan_profiler():
+            asyncio.run(service.run(args.duration))
+    except KeyboardInterrupt:
+        pass
+
+    print("\n--- Rolling Sentiment (by publish time) ---")
+    for query, (count, distribution, mean_score) in service.snapshot().items():
+        split = ', '.join(f"{label}: {n}" for label, n in distribution.items())
+        print(f"{query}: {count} articles in the last {next(iter(service.index.windows))} ({split}) | "
+              f"mean score {mean_score:+.2f}")
+        print_signals(service.index, query)
+    stage_metrics.report()
+
+
+if __name__ == "__main__":
+    main()
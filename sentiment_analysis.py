@@ -1,114 +1,67 @@
-import feedparser
-import requests
-from bs4 import BeautifulSoup
-from textblob import TextBlob
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from datetime import datetime
-from urllib.parse import quote
-
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
+import os
+
 import numpy as np
 
-# GPU setup
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-print(f"🚀 Using device: {device}")
-if torch.cuda.is_available():
-    print(f"   GPU: {torch.cuda.get_device_name(0)}")
-    print(f"   VRAM: {torch.cuda.get_device_properties(0).total_memory / 1e9:.1f} GB\n")
-
-finbert_model = AutoModelForSequenceClassification.from_pretrained("yiyanghkust/finbert-tone").to(device)
-finbert_tokenizer = AutoTokenizer.from_pretrained("yiyanghkust/finbert-tone")
-
-labels = ['Positive', 'Negative', 'Neutral']
-
-def fetch_news(query, num_articles=10):
-    rss_url = f"https://news.google.com/rss/search?q={quote(query)}"
-    feed = feedparser.parse(rss_url)
-    news_items = feed.entries[:num_articles]
-
-    articles = []
-    for item in news_items:
-        title = item.title
-        link = item.link
-        published = item.published
-        content = fetch_article_content(link)
-        
-        articles.append({
-            "title": title,
-            "link": link,
-            "published": published,
-            "content": content
-        })
-
-    return articles
-
-def fetch_article_content(url):
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        paragraphs = soup.find_all('p')
-        content = ' '.join([p.get_text() for p in paragraphs])
-        return content.strip()
-    except requests.RequestException:
-        return "Content not retrieved."
-
-# VADER Sentiment Analysis (Fast, Lexicon-based)
-# Uncomment this to use VADER instead of FinBERT
-# def analyze_sentiment(text):
-#     analyzer = SentimentIntensityAnalyzer()
-#     scores = analyzer.polarity_scores(text)
-#     polarity = scores['compound']
-#
-#     if polarity > 0.05:
-#         sentiment = 'Positive'
-#     elif polarity < -0.05:
-#         sentiment = 'Negative'
-#     else:
-#         sentiment = 'Neutral'
-#
-#     return polarity, sentiment
-
-# FinBERT Sentiment Analysis (Accurate, Transformer-based, GPU-accelerated)
-def analyze_sentiment(text):
-    if not text.strip():
-        return 0.0, 'Neutral'
-
-    inputs = finbert_tokenizer(text, return_tensors="pt", truncation=True, max_length=512).to(device)
-    with torch.no_grad():
-        outputs = finbert_model(**inputs)
-
-    logits = outputs.logits
-    probabilities = torch.softmax(logits, dim=1).cpu().numpy()[0]
-    max_index = np.argmax(probabilities)
-    sentiment = labels[max_index]
-    confidence = probabilities[max_index]
-
-    return confidence, sentiment
-
-
-def summarize_sentiments(articles):
-    summary = {
-        "Positive": 0,
-        "Negative": 0,
-        "Neutral": 0
-    }
-
-    for article in articles:
-        # print("-"*25)
-        # print(f"\n--- Analyzing Article: {article['title']} ---")
-        # print(f"Published: {article['published']}")
-        # print(article['content'])
-        _, sentiment = analyze_sentiment(article['title']) # + " " + article['content'])
-        summary[sentiment] += 1
-
-    total = len(articles)
+import stage_metrics
+from batch_scheduler import print_padding_stats
+from news_fetcher import fetch_news, fetch_article_content
+from sentiment_cache import print_cache_stats
+from dedup import ArticleDeduplicator, print_dedup_report
+from pipeline import stream_sentiments
+from results_store import ResultsStore
+from sentiment_index import SentimentIndex, print_signals
+from sentiment_engines import LABELS, LABEL_INDEX, SentimentScores, label_distribution
+# Scoring lives in its own module so pipeline.py shares these caches even when this file runs as __main__
+from sentiment_scoring import DEFAULT_ENGINE, get_cache, label_names, score_documents, score_sentiments
+
+# Public API, including the fetch / scoring helpers re-exported from news_fetcher and sentiment_scoring
+__all__ = [
+    'DEFAULT_ENGINE', 'RESULTS_STORE', 'labels', 'fetch_news', 'fetch_article_content', 'get_cache',
+    'score_sentiments', 'score_documents', 'label_names', 'analyze_sentiments', 'analyze_sentiment',
+    'summarize_sentiments', 'print_sentiment_summary', 'main',
+]
+
+labels = LABELS
+
+# Directory of a results_store.ResultsStore that main() appends every scored article to (unset: off)
+RESULTS_STORE = os.environ.get("RESULTS_STORE")
+
+
+def analyze_sentiments(texts, engine=None, batch_size=32, max_tokens=4096, return_stats=False, use_cache=True):
+    """Batched sentiment analysis with the selected engine, returns (score, label) per text in input order"""
+    results, stats = score_sentiments(texts, engine, batch_size, max_tokens, return_stats=True, use_cache=use_cache)
+    results = list(zip(results.scores.tolist(), label_names(results.label_indices)))
+    if return_stats:
+        return results, stats
+    return results
+
+
+def analyze_sentiment(text, engine=None):
+    """Single-text convenience wrapper around analyze_sentiments"""
+    return analyze_sentiments([text], engine=engine)[0]
+
+
+def summarize_sentiments(articles, sentiments=None):
+    """Print the label distribution; sentiments are SentimentScores or (score, label) tuples"""
+    if sentiments is None:
+        sentiments = score_sentiments([article['title'] for article in articles])  # + " " + article['content']
+
+    if isinstance(sentiments, SentimentScores):
+        label_indices = sentiments.label_indices
+    else:
+        label_indices = np.fromiter((LABEL_INDEX[label] for _, label in sentiments), dtype=np.int8)
+    counts = label_distribution(label_indices)
+    print_sentiment_summary(counts)
+    return counts
+
+
+def print_sentiment_summary(counts):
+    """Print a label distribution (counts in LABELS order)"""
+    total = int(counts.sum())
     print("\n--- Market Sentiment Summary ---")
     print(f"Total articles analyzed: {total}")
-    for sentiment, count in summary.items():
-        percent = (count / total) * 100
+    for sentiment, count in zip(labels, counts.tolist()):
+        percent = (count / total) * 100 if total else 0.0
         print(f"{sentiment}: {count} ({percent:.2f}%)")
 
 def main():
@@ -122,22 +75,41 @@ def main():
         "gold investment"
     ]
     num_articles_per_query = 10
-    all_articles = []
-
-    for query in queries:
-        print(f"Fetching news articles for '{query}'...\n")
-        articles = fetch_news(query, num_articles_per_query)
-        all_articles.extend(articles)
-
-    for idx, article in enumerate(all_articles, 1):
-        print(f"Article {idx}: {article['title']}")
-        print(f"Link: {article['link']}")
-        print(f"Published: {article['published']}")
-
-        polarity, sentiment = analyze_sentiment(article['title'])  # or article['content']
-        print(f"Sentiment: {sentiment} (Polarity: {polarity:.2f})\n")
 
-    summarize_sentiments(all_articles)
+    print(f"Sentiment engine: {DEFAULT_ENGINE}")
+    print(f"Streaming news articles for {len(queries)} queries...\n")
+
+    # fetch -> dedupe -> batch -> score: each micro-batch is printed as soon as it is scored
+    deduplicator = ArticleDeduplicator(near_duplicates=True)
+    store = ResultsStore(RESULTS_STORE) if RESULTS_STORE else None
+    index = SentimentIndex()
+    aggregate = None
+    idx = 0
+    with stage_metrics.scan_profiler():
+        for batch in stream_sentiments(queries, num_articles_per_query, deduplicator=deduplicator, store=store):
+            names = label_names(batch.scores.label_indices)
+            for article, polarity, sentiment in zip(batch.articles, batch.scores.scores.tolist(), names):
+                idx += 1
+                print(f"Article {idx}: {article['title']}")
+                print(f"Link: {article['link']}")
+                print(f"Published: {article['published']}")
+                print(f"Sentiment: {sentiment} (Polarity: {polarity:.2f})\n")
+            index.add_batch(batch.articles, batch.scores)
+            aggregate = batch.aggregate
+
+    stage_metrics.report()
+    if store is not None:
+        print(f"🗄️  Appended {idx} articles to {store.path}/ ({len(store)} rows)")
+    print_dedup_report(deduplicator.report)
+    if aggregate is None:
+        print("\nNo articles fetched.")
+        return
+    print_sentiment_summary(aggregate.counts)
+    print("\n--- Market Signal (by publish time) ---")
+    print_signals(index)
+    if aggregate.padding_stats:
+        print_padding_stats(aggregate.padding_stats)
+    print_cache_stats(get_cache().stats())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
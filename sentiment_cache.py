@@ -0,0 +1,177 @@
+"""
+Sentiment Cache
+In-process LRU backed by SQLite, keyed by a hash of engine, model id and normalized text
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+DEFAULT_CACHE_PATH = "sentiment_cache.db"
+
+
+def normalize_text(text):
+    """Normalize text for cache keys (unicode NFC, collapsed whitespace; case is kept for VADER)"""
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+def cache_key(text, model_id, engine):
+    """Content-addressed key for one (engine, model, text) score"""
+    payload = f"{engine}\x00{model_id}\x00{normalize_text(text)}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class SentimentCache:
+    """Two-level (memory LRU + SQLite) cache of (score, label) results"""
+
+    def __init__(self, model_id, engine, path=DEFAULT_CACHE_PATH,
+                 max_memory_entries=50_000, max_disk_entries=1_000_000):
+        self.model_id = model_id
+        self.engine = engine
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS sentiments ("
+                "key TEXT PRIMARY KEY, score REAL NOT NULL, label TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS sentiments_last_used ON sentiments (last_used)")
+            self._db.commit()
+
+    def _remember(self, key, result):
+        """Insert into the memory LRU, evicting the least recently used entry"""
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get_many(self, texts):
+        """Cached (score, label) per text, None where missing"""
+        keys = [cache_key(text, self.model_id, self.engine) for text in texts]
+        results = [None] * len(texts)
+        disk_lookup = {}
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                result = self._memory.get(key)
+                if result is not None:
+                    self._memory.move_to_end(key)
+                    results[i] = result
+                    self.memory_hits += 1
+                else:
+                    disk_lookup.setdefault(key, []).append(i)
+
+            if disk_lookup and self._db is not None:
+                found = {}
+                pending = list(disk_lookup)
+                # Stay under SQLite's bound-parameter limit
+                for start in range(0, len(pending), 500):
+                    chunk = pending[start:start + 500]
+                    rows = self._db.execute(
+                        f"SELECT key, score, label FROM sentiments WHERE key IN ({','.join('?' * len(chunk))})",
+                        chunk
+                    ).fetchall()
+                    found.update((key, (score, label)) for key, score, label in rows)
+
+                if found:
+                    now = time.time()
+                    self._db.executemany(
+                        "UPDATE sentiments SET last_used = ? WHERE key = ?",
+                        [(now, key) for key in found]
+                    )
+                    self._db.commit()
+
+                for key, result in found.items():
+                    self._remember(key, result)
+                    for i in disk_lookup.pop(key):
+                        results[i] = result
+                        self.disk_hits += 1
+
+            self.misses += sum(len(indices) for indices in disk_lookup.values())
+
+        return results
+
+    def put_many(self, texts, results):
+        """Store (score, label) results for texts"""
+        now = time.time()
+        rows = []
+
+        with self._lock:
+            for text, (score, label) in zip(texts, results):
+                key = cache_key(text, self.model_id, self.engine)
+                result = (float(score), label)
+                self._remember(key, result)
+                rows.append((key, result[0], label, now))
+
+            if self._db is not None and rows:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO sentiments (key, score, label, last_used) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                self._evict_disk()
+                self._db.commit()
+
+    def _evict_disk(self):
+        """Drop the least recently used rows once the table exceeds max_disk_entries"""
+        (count,) = self._db.execute("SELECT COUNT(*) FROM sentiments").fetchone()
+        overflow = count - self.max_disk_entries
+        if overflow > 0:
+            self._db.execute(
+                "DELETE FROM sentiments WHERE key IN "
+                "(SELECT key FROM sentiments ORDER BY last_used LIMIT ?)",
+                (overflow,)
+            )
+            self.evictions += overflow
+
+    def clear(self):
+        """Remove every cached entry (memory and disk)"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM sentiments")
+                self._db.commit()
+
+    def close(self):
+        """Close the SQLite connection"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self):
+        """Hit/miss counters"""
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            'engine': self.engine,
+            'model_id': self.model_id,
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate_pct': (hits / lookups * 100) if lookups else 0.0,
+            'memory_entries': len(self._memory),
+            'evictions': self.evictions,
+        }
+
+
+def print_cache_stats(stats):
+    """Print a one-block cache report"""
+    print("\n--- Sentiment Cache ---")
+    print(f"Hits: {stats['memory_hits']} memory + {stats['disk_hits']} disk | "
+          f"Misses: {stats['misses']} | Hit rate: {stats['hit_rate_pct']:.1f}%")
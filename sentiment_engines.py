@@ -0,0 +1,266 @@
+"""
+Sentiment Engines
+Batch-oriented engine interface with registered VADER, FinBERT and TextBlob backends
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+import stage_metrics
+from batch_scheduler import schedule_batches, padding_stats
+from model_registry import FINBERT_MODEL_ID, get_model
+
+# Label index order shared by every engine (FinBERT's output order)
+LABELS = ['Positive', 'Negative', 'Neutral']
+POSITIVE, NEGATIVE, NEUTRAL = range(3)
+LABEL_INDEX = {label: index for index, label in enumerate(LABELS)}
+
+# Compact batch result: int8 label index and float32 score per text
+SentimentScores = namedtuple('SentimentScores', ['label_indices', 'scores'])
+
+# How per-window predictions of a long document are combined (see aggregate_windows)
+DOCUMENT_AGGREGATIONS = ('mean', 'length', 'max')
+DEFAULT_OVERLAP = 128
+
+_engine_factories = {}
+_engines = {}
+
+
+def logits_to_labels(logits):
+    """Label index and softmax confidence per row of an (n, num_labels) logits array"""
+    logits = np.asarray(logits, dtype=np.float32)
+    label_indices = np.argmax(logits, axis=1)
+    # Softmax probability of the argmax: exp(0) / sum(exp(logits - max)), no full probability matrix kept
+    shifted = logits - logits[np.arange(len(logits)), label_indices][:, None]
+    scores = 1.0 / np.exp(shifted).sum(axis=1)
+    return SentimentScores(label_indices.astype(np.int8), scores.astype(np.float32))
+
+
+def window_features(tokenizer, texts, max_length=512, overlap=DEFAULT_OVERLAP):
+    """Tokenize whole documents into overlapping model-sized windows (`overlap` tokens shared between neighbours)
+
+    Returns (features: key -> one list per window, owning document index per window, window lengths).
+    Windows of the same document are contiguous.
+    """
+    encoded = tokenizer(
+        list(texts), truncation=True, max_length=max_length, stride=overlap, return_overflowing_tokens=True
+    )
+    owners = np.asarray(encoded.pop('overflow_to_sample_mapping'), dtype=np.intp)
+    features = {key: encoded[key] for key in encoded.keys()}
+    lengths = [len(ids) for ids in features['input_ids']]
+    return features, owners, lengths
+
+
+def aggregate_windows(logits, owners, num_documents, lengths=None, method='mean'):
+    """One SentimentScores row per document from its windows' logits
+
+    'mean' averages the window probabilities, 'length' weights them by window token count,
+    'max' takes the label and confidence of the document's most confident window.
+    """
+    if method not in DOCUMENT_AGGREGATIONS:
+        raise ValueError(f"Unknown aggregation '{method}' (use one of {', '.join(DOCUMENT_AGGREGATIONS)})")
+    logits = np.asarray(logits, dtype=np.float32)
+    probabilities = np.exp(logits - logits.max(axis=1, keepdims=True))
+    probabilities /= probabilities.sum(axis=1, keepdims=True)
+
+    if method == 'max':
+        confidence = probabilities.max(axis=1)
+        # Sort by document, most confident window first, and keep each document's first row
+        order = np.lexsort((-confidence, owners))
+        first = order[np.r_[True, owners[order][1:] != owners[order][:-1]]]
+        return SentimentScores(probabilities[first].argmax(axis=1).astype(np.int8), confidence[first])
+
+    weights = np.ones(len(owners)) if method == 'mean' else np.asarray(lengths, dtype=np.float64)
+    totals = np.zeros((num_documents, len(LABELS)))
+    np.add.at(totals, owners, probabilities * weights[:, None])
+    totals /= np.bincount(owners, weights=weights, minlength=num_documents)[:, None]
+    return SentimentScores(totals.argmax(axis=1).astype(np.int8), totals.max(axis=1).astype(np.float32))
+
+
+def label_distribution(label_indices):
+    """Count of each label (LABELS order) in a label index array"""
+    return np.bincount(np.asarray(label_indices, dtype=np.intp), minlength=len(LABELS))
+
+
+class SentimentEngine:
+    """Engine protocol: score_batch(texts) -> SentimentScores(label index array, score array)"""
+
+    name = None
+    model_id = None
+
+    def score_batch(self, texts, batch_size=None, max_tokens=None):
+        """Score texts in one call; batch_size/max_tokens are hints engines may ignore"""
+        raise NotImplementedError
+
+    def score_documents(self, texts, aggregate='mean', overlap=DEFAULT_OVERLAP, batch_size=None, max_tokens=None):
+        """Score whole documents; engines without an input length limit just score each text"""
+        return self.score_batch(texts, batch_size=batch_size, max_tokens=max_tokens)
+
+    def warm_up(self):
+        """Load whatever the engine needs before the first timed call"""
+        self.score_batch(["warm up"])
+
+
+class PolarityEngine(SentimentEngine):
+    """Lexicon engine mapping a [-1, 1] polarity to labels with a neutral band"""
+
+    model_name = None
+
+    def __init__(self, threshold=0.05):
+        self.threshold = threshold
+
+    def polarity(self, analyzer, text):
+        raise NotImplementedError
+
+    def score_batch(self, texts, batch_size=None, max_tokens=None):
+        analyzer = get_model(self.model_name)
+        # The lexicon pass is this engine's forward pass
+        with stage_metrics.stage('forward', len(texts)):
+            scores = np.fromiter(
+                (self.polarity(analyzer, text) for text in texts),
+                dtype=np.float32, count=len(texts)
+            )
+        label_indices = np.full(len(texts), NEUTRAL, dtype=np.int8)
+        label_indices[scores > self.threshold] = POSITIVE
+        label_indices[scores < -self.threshold] = NEGATIVE
+        return SentimentScores(label_indices, scores)
+
+
+class VaderEngine(PolarityEngine):
+    """VADER (fast, lexicon-based); score is the compound polarity"""
+
+    name = 'vader'
+    model_id = 'vaderSentiment'
+    model_name = 'vader'
+
+    def polarity(self, analyzer, text):
+        return analyzer.polarity_scores(text)['compound']
+
+
+class TextBlobEngine(PolarityEngine):
+    """TextBlob pattern analyzer (lexicon-based); score is the polarity"""
+
+    name = 'textblob'
+    model_id = 'textblob-pattern'
+    model_name = 'textblob'
+
+    def polarity(self, analyzer, text):
+        return analyzer.analyze(text).polarity
+
+
+class FinBertEngine(SentimentEngine):
+    """FinBERT (accurate, transformer-based, GPU-accelerated); score is the label confidence"""
+
+    name = 'finbert'
+    model_id = FINBERT_MODEL_ID
+    model_name = 'finbert'
+
+    def __init__(self, batch_size=32, max_tokens=4096, max_length=512):
+        self.batch_size = batch_size
+        self.max_tokens = max_tokens
+        self.max_length = max_length
+        self.last_batch_stats = None
+
+    def score_batch(self, texts, batch_size=None, max_tokens=None):
+        batch_size = batch_size or self.batch_size
+        max_tokens = max_tokens or self.max_tokens
+        if not texts:
+            self.last_batch_stats = padding_stats([], [], naive_batch_size=batch_size)
+            return SentimentScores(np.zeros(0, dtype=np.int8), np.zeros(0, dtype=np.float32))
+
+        finbert = get_model(self.model_name)
+
+        # Tokenize once without padding, then bucket by length under a token budget
+        with stage_metrics.stage('tokenize', len(texts)):
+            encoded = finbert.tokenizer(list(texts), truncation=True, max_length=self.max_length)
+            lengths = [len(ids) for ids in encoded['input_ids']]
+            batches = schedule_batches(lengths, max_tokens=max_tokens, max_batch_size=batch_size)
+
+        logits = self.batched_logits(finbert, encoded, batches)
+        self.last_batch_stats = padding_stats(lengths, batches, naive_batch_size=batch_size)
+        # Softmax/argmax/gather once over every text instead of per batch
+        with stage_metrics.stage('post_process', len(texts)):
+            return logits_to_labels(logits)
+
+    def score_documents(self, texts, aggregate='mean', overlap=DEFAULT_OVERLAP, batch_size=None, max_tokens=None):
+        """Full-length scoring: every document is cut into overlapping max_length windows, the windows
+        of all documents are packed into shared length-bucketed batches, and their probabilities are
+        aggregated back per document, so cost follows the total token count"""
+        batch_size = batch_size or self.batch_size
+        max_tokens = max_tokens or self.max_tokens
+        if not texts:
+            self.last_batch_stats = padding_stats([], [], naive_batch_size=batch_size)
+            return SentimentScores(np.zeros(0, dtype=np.int8), np.zeros(0, dtype=np.float32))
+
+        finbert = get_model(self.model_name)
+        with stage_metrics.stage('tokenize', len(texts)):
+            features, owners, lengths = window_features(finbert.tokenizer, texts, self.max_length, overlap)
+            batches = schedule_batches(lengths, max_tokens=max_tokens, max_batch_size=batch_size)
+
+        logits = self.batched_logits(finbert, features, batches)
+        self.last_batch_stats = padding_stats(lengths, batches, naive_batch_size=batch_size)
+        with stage_metrics.stage('post_process', len(texts)):
+            return aggregate_windows(logits, owners, len(texts), lengths, aggregate)
+
+    def batched_logits(self, finbert, encoded, batches):
+        """(n, num_labels) logits for pre-tokenized inputs (key -> per-row lists), one forward pass per batch"""
+        import torch
+
+        logits = np.empty((len(encoded['input_ids']), len(LABELS)), dtype=np.float32)
+        for batch in batches:
+            # Padding, host->device copy, forward and the copy back (which waits for the GPU)
+            with stage_metrics.stage('forward', len(batch)):
+                # Dynamic padding: each batch is only padded to its own longest text
+                features = [{key: encoded[key][i] for key in encoded.keys()} for i in batch]
+                inputs = finbert.tokenizer.pad(features, return_tensors="pt").to(finbert.device)
+
+                with torch.inference_mode():
+                    logits[batch] = self.logits(finbert, inputs).float().cpu().numpy()
+        return logits
+
+    def logits(self, finbert, inputs):
+        """Forward pass for one padded batch; alternative backends override this"""
+        return finbert.model(**inputs).logits
+
+
+def register_engine(name, factory):
+    """Register an engine factory under a name"""
+    _engine_factories[name] = factory
+    _engines.pop(name, None)
+
+
+def available_engines():
+    """Names of all registered engines"""
+    return sorted(_engine_factories)
+
+
+def get_engine(name):
+    """Shared engine instance for a name (built once)"""
+    if name not in _engines:
+        if name not in _engine_factories:
+            raise KeyError(f"Unknown sentiment engine '{name}' (available: {', '.join(available_engines())})")
+        _engines[name] = _engine_factories[name]()
+    return _engines[name]
+
+
+def _finbert_pool_engine():
+    from inference_pool import FinBertPoolEngine
+
+    return FinBertPoolEngine()
+
+
+def _finbert_backend_engine(backend):
+    def factory():
+        from finbert_backends import BACKEND_ENGINES
+
+        return BACKEND_ENGINES[backend]()
+    return factory
+
+
+register_engine('vader', VaderEngine)
+register_engine('finbert', FinBertEngine)
+register_engine('textblob', TextBlobEngine)
+register_engine('finbert-pool', _finbert_pool_engine)
+for _backend in ('finbert-int8', 'finbert-torchscript', 'finbert-onnx'):
+    register_engine(_backend, _finbert_backend_engine(_backend))
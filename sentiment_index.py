@@ -0,0 +1,168 @@
+"""
+Sentiment Index
+Rolling per-query sentiment over several windows (5m / 1h / 1d), keyed on each article's parsed
+publish time and kept in fixed-size ring buffers, so every update and every signal read is O(1)
+"""
+
+import re
+import time
+
+from news_fetcher import published_epoch
+from sentiment_engines import LABELS, NEGATIVE, POSITIVE
+
+# Window name -> seconds; each window is split into SLOTS ring-buffer buckets
+DEFAULT_WINDOWS = {'5m': 300, '1h': 3600, '1d': 86400}
+SLOTS = 60
+
+# Net sentiment ((positive - negative) / total) needed for a BULLISH / BEARISH call
+SIGNAL_THRESHOLD = 0.15
+MIN_SIGNAL_ARTICLES = 5
+
+_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_window(text):
+    """Seconds in a window spec like '90s', '5m', '1h' or '1d' (a bare number is seconds)"""
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([smhd]?)', text.strip())
+    if match is None:
+        raise ValueError(f"Bad window '{text}' (use e.g. 5m, 1h, 1d)")
+    return float(match.group(1)) * _UNITS[match.group(2) or 's']
+
+
+class RingWindow:
+    """Sliding window of SLOTS time buckets with running label counts and score sum
+
+    Adding an event touches one bucket; moving time forward clears only the buckets that
+    fall out of the window, so both are O(1) amortized and memory never grows.
+    """
+
+    def __init__(self, seconds, slots=SLOTS):
+        self.seconds = seconds
+        self.slots = slots
+        self.width = seconds / slots
+        self.counts = [[0] * len(LABELS) for _ in range(slots)]
+        self.score_sums = [0.0] * slots
+        self.slot_ids = [None] * slots
+        self.totals = [0] * len(LABELS)
+        self.score_sum = 0.0
+        self.head = None
+
+    def _clear(self, i):
+        if self.slot_ids[i] is None:
+            return
+        counts = self.counts[i]
+        for label_index in range(len(LABELS)):
+            self.totals[label_index] -= counts[label_index]
+            counts[label_index] = 0
+        self.score_sum -= self.score_sums[i]
+        self.score_sums[i] = 0.0
+        self.slot_ids[i] = None
+
+    def advance(self, now):
+        """Move the window's end to `now`, expiring buckets that fell out of it"""
+        slot = int(now // self.width)
+        if self.head is None:
+            self.head = slot
+            return
+        if slot <= self.head:
+            return
+        for expired in range(max(self.head + 1, slot - self.slots + 1), slot + 1):
+            self._clear(expired % self.slots)
+        self.head = slot
+
+    def add(self, timestamp, label_index, score):
+        """Count one event at `timestamp`; returns False if it is already outside the window"""
+        slot = int(timestamp // self.width)
+        self.advance(timestamp)
+        if slot <= self.head - self.slots:
+            return False
+        i = slot % self.slots
+        if self.slot_ids[i] != slot:
+            self._clear(i)
+            self.slot_ids[i] = slot
+        self.counts[i][label_index] += 1
+        self.totals[label_index] += 1
+        self.score_sums[i] += score
+        self.score_sum += score
+        return True
+
+    def __len__(self):
+        return sum(self.totals)
+
+
+class SentimentIndex:
+    """RingWindows per query (plus an overall entry under None) for every configured window"""
+
+    def __init__(self, windows=None, slots=SLOTS):
+        self.windows = dict(windows or DEFAULT_WINDOWS)
+        self.slots = slots
+        self._rings = {}
+
+    def _query_rings(self, query):
+        rings = self._rings.get(query)
+        if rings is None:
+            rings = self._rings[query] = {name: RingWindow(seconds, self.slots) for name, seconds in self.windows.items()}
+        return rings
+
+    @property
+    def horizon(self):
+        """Longest window in seconds: older headlines can no longer count anywhere"""
+        return max(self.windows.values())
+
+    @property
+    def queries(self):
+        return [query for query in self._rings if query is not None]
+
+    def add(self, label_index, score, published=None, query=None, now=None, overall=True):
+        """Record one scored headline at its publish time (scan time if unknown, never in the future)
+
+        overall=False counts it for its query only (a story already counted under another query).
+        """
+        now = time.time() if now is None else now
+        timestamp = now if published is None else min(published, now)
+        keys = ((None,) if overall else ()) + ((query,) if query is not None else ())
+        for key in keys:
+            for ring in self._query_rings(key).values():
+                ring.advance(now)
+                ring.add(timestamp, label_index, score)
+
+    def add_batch(self, articles, scores, now=None):
+        """Record a scored batch (articles with 'published' / 'query', SentimentScores)"""
+        now = time.time() if now is None else now
+        for article, label_index, score in zip(articles, scores.label_indices.tolist(), scores.scores.tolist()):
+            self.add(label_index, score, published_epoch(article.get('published')), article.get('query'), now)
+
+    def summary(self, query=None, window=None, now=None):
+        """Count, label distribution, mean score and net sentiment of one query (None: all) and window"""
+        window = window or next(iter(self.windows))
+        ring = self._query_rings(query)[window]
+        ring.advance(time.time() if now is None else now)
+        count = len(ring)
+        return {
+            'count': count,
+            'distribution': dict(zip(LABELS, ring.totals)),
+            'mean_score': ring.score_sum / count if count else 0.0,
+            'net': (ring.totals[POSITIVE] - ring.totals[NEGATIVE]) / count if count else 0.0,
+        }
+
+    def signal(self, query=None, window=None, now=None, threshold=SIGNAL_THRESHOLD, min_articles=MIN_SIGNAL_ARTICLES):
+        """('BULLISH' | 'BEARISH' | 'NEUTRAL', summary) from the window's net sentiment"""
+        summary = self.summary(query, window, now)
+        if summary['count'] < min_articles:
+            return 'NEUTRAL', summary
+        if summary['net'] > threshold:
+            return 'BULLISH', summary
+        if summary['net'] < -threshold:
+            return 'BEARISH', summary
+        return 'NEUTRAL', summary
+
+
+SIGNAL_EMOJI = {'BULLISH': '🟢', 'BEARISH': '🔴', 'NEUTRAL': '⚪'}
+
+
+def print_signals(index, query=None, now=None):
+    """One line per window: signal, net sentiment and article count"""
+    for window in index.windows:
+        signal, summary = index.signal(query, window, now)
+        print(f"   {window:>4}: {SIGNAL_EMOJI[signal]} {signal:<8} net {summary['net']:+.2f} "
+              f"over {summary['count']} articles")
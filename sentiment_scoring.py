@@ -0,0 +1,101 @@
+"""
+Sentiment Scoring
+Engine selection, the shared per-engine sentiment caches and the batch scoring entry points
+used by the scanner, the streaming pipeline and the incremental / service scans
+"""
+
+import itertools
+import os
+
+import numpy as np
+
+from sentiment_cache import SentimentCache, normalize_text
+from sentiment_engines import DEFAULT_OVERLAP, LABELS, LABEL_INDEX, NEUTRAL, SentimentScores, get_engine
+
+# Sentiment engine: 'finbert' (accurate, transformer-based), 'vader' or 'textblob' (fast, lexicon-based)
+DEFAULT_ENGINE = os.environ.get("SENTIMENT_ENGINE", "finbert")
+
+_caches = {}
+
+
+def get_cache(engine=None):
+    """Shared sentiment cache for an engine (created on first use)"""
+    engine = get_engine(engine or DEFAULT_ENGINE)
+    if engine.name not in _caches:
+        _caches[engine.name] = SentimentCache(engine.model_id, engine.name)
+    return _caches[engine.name]
+
+
+def score_sentiments(texts, engine=None, batch_size=32, max_tokens=4096, return_stats=False, use_cache=True):
+    """Batched sentiment analysis with the selected engine, returns SentimentScores arrays in input order"""
+    engine = get_engine(engine or DEFAULT_ENGINE)
+    label_indices = np.full(len(texts), NEUTRAL, dtype=np.int8)
+    scores = np.zeros(len(texts), dtype=np.float32)
+    indices = [i for i, text in enumerate(texts) if text.strip()]
+
+    cache = get_cache(engine.name) if use_cache else None
+    if cache is not None and indices:
+        cached = cache.get_many([texts[i] for i in indices])
+        for i, result in zip(indices, cached):
+            if result is not None:
+                scores[i], label_indices[i] = result[0], LABEL_INDEX[result[1]]
+        indices = [i for i, result in zip(indices, cached) if result is None]
+
+    # With the cache on, score each distinct text once, however many queries returned it
+    positions = {}
+    for i in indices:
+        positions.setdefault(normalize_text(texts[i]) if cache is not None else i, []).append(i)
+    groups = list(positions.values())
+    unique_texts = [texts[group[0]] for group in groups]
+
+    stats = None
+    if unique_texts:
+        scored = engine.score_batch(unique_texts, batch_size=batch_size, max_tokens=max_tokens)
+        stats = getattr(engine, 'last_batch_stats', None)
+
+        # Scatter each unique result to every position that shares its text
+        targets = np.fromiter(itertools.chain.from_iterable(groups), dtype=np.intp, count=len(indices))
+        sources = np.repeat(np.arange(len(groups)), [len(group) for group in groups])
+        label_indices[targets] = scored.label_indices[sources]
+        scores[targets] = scored.scores[sources]
+
+        if cache is not None:
+            cache.put_many(unique_texts, zip(scored.scores.tolist(), label_names(scored.label_indices)))
+
+    results = SentimentScores(label_indices, scores)
+    if return_stats:
+        return results, stats
+    return results
+
+
+def score_documents(texts, engine=None, aggregate='mean', overlap=DEFAULT_OVERLAP, batch_size=32, max_tokens=4096,
+                    return_stats=False):
+    """Full-text sentiment of long documents (e.g. article content), returns SentimentScores in input order
+
+    Instead of truncating at 512 tokens, each document is split into overlapping windows that
+    are batched together with the other documents' windows; the per-window probabilities are
+    combined per document by `aggregate` ('mean', 'length' weighted or 'max' confidence).
+    Not cached: document scores depend on the aggregation.
+    """
+    engine = get_engine(engine or DEFAULT_ENGINE)
+    label_indices = np.full(len(texts), NEUTRAL, dtype=np.int8)
+    scores = np.zeros(len(texts), dtype=np.float32)
+    indices = np.array([i for i, text in enumerate(texts) if text.strip()], dtype=np.intp)
+
+    stats = None
+    if len(indices):
+        scored = engine.score_documents([texts[i] for i in indices], aggregate=aggregate, overlap=overlap,
+                                        batch_size=batch_size, max_tokens=max_tokens)
+        stats = getattr(engine, 'last_batch_stats', None)
+        label_indices[indices] = scored.label_indices
+        scores[indices] = scored.scores
+
+    results = SentimentScores(label_indices, scores)
+    if return_stats:
+        return results, stats
+    return results
+
+
+def label_names(label_indices):
+    """Label strings for a label index array"""
+    return [LABELS[index] for index in label_indices.tolist()]
@@ -0,0 +1,281 @@
+"""
+Stage Metrics
+Per-stage timers and counters with fixed-memory latency histograms, exportable snapshots and
+an optional cProfile / torch.profiler hook around a scan
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+import numpy as np
+
+# STAGE_METRICS=0 turns every timer into a no-op
+ENABLED = os.environ.get("STAGE_METRICS", "1") != "0"
+# Where scans write their snapshot / cProfile stats / torch.profiler trace (unset: not written)
+EXPORT_PATH = os.environ.get("STAGE_METRICS_FILE")
+PROFILE_PATH = os.environ.get("SCAN_PROFILE")
+TORCH_TRACE_PATH = os.environ.get("SCAN_TORCH_TRACE")
+
+# Pipeline stages, in the order they are reported
+STAGES = ('rss_fetch', 'rss_parse', 'article_download', 'html_parse', 'tokenize', 'forward', 'post_process')
+
+
+class LatencyHistogram:
+    """HDR-style log-bucketed histogram: fixed memory, percentiles within `precision` relative error"""
+
+    def __init__(self, lowest_ns=1_000, highest_ns=3_600 * 10**9, precision=0.01):
+        self.lowest_ns = lowest_ns
+        self.highest_ns = highest_ns
+        self.precision = precision
+        self._log_base = math.log1p(precision)
+        self.counts = np.zeros(self._index(highest_ns) + 1, dtype=np.int64)
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+
+    def _index(self, ns):
+        return int(math.log(max(ns, self.lowest_ns) / self.lowest_ns) / self._log_base)
+
+    def record(self, ns):
+        """Add one duration in nanoseconds"""
+        self.counts[min(self._index(ns), len(self.counts) - 1)] += 1
+        self.count += 1
+        self.total_ns += ns
+        self.min_ns = ns if self.min_ns is None else min(self.min_ns, ns)
+        self.max_ns = max(self.max_ns, ns)
+
+    def merge(self, other):
+        """Fold another histogram with the same bucket layout into this one"""
+        self.counts += other.counts
+        self.count += other.count
+        self.total_ns += other.total_ns
+        if other.min_ns is not None:
+            self.min_ns = other.min_ns if self.min_ns is None else min(self.min_ns, other.min_ns)
+        self.max_ns = max(self.max_ns, other.max_ns)
+
+    def percentile(self, q):
+        """Approximate q-th percentile in ns (bucket midpoint, clamped to the observed range)"""
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(q / 100 * self.count))
+        index = int(np.searchsorted(np.cumsum(self.counts), target))
+        value = self.lowest_ns * math.exp((index + 0.5) * self._log_base)
+        return float(min(max(value, self.min_ns), self.max_ns))
+
+    @property
+    def mean_ns(self):
+        return self.total_ns / self.count if self.count else 0.0
+
+    def to_dict(self):
+        """Summary in ms plus the non-empty buckets, so snapshots can be merged later"""
+        nonzero = np.flatnonzero(self.counts)
+        return {
+            'count': self.count,
+            'total_ms': self.total_ns / 1e6,
+            'mean_ms': self.mean_ns / 1e6,
+            'min_ms': (self.min_ns or 0) / 1e6,
+            'max_ms': self.max_ns / 1e6,
+            'p50_ms': self.percentile(50) / 1e6,
+            'p90_ms': self.percentile(90) / 1e6,
+            'p99_ms': self.percentile(99) / 1e6,
+            'p999_ms': self.percentile(99.9) / 1e6,
+            'layout': [self.lowest_ns, self.highest_ns, self.precision],
+            'buckets': dict(zip(nonzero.tolist(), self.counts[nonzero].tolist())),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a histogram from to_dict() output"""
+        histogram = cls(*data['layout'])
+        for index, count in data['buckets'].items():
+            histogram.counts[int(index)] = count
+        histogram.count = data['count']
+        histogram.total_ns = int(data['total_ms'] * 1e6)
+        histogram.min_ns = int(data['min_ms'] * 1e6) if data['count'] else None
+        histogram.max_ns = int(data['max_ms'] * 1e6)
+        return histogram
+
+
+class StageMetrics:
+    """Thread-safe registry of per-stage latency histograms, item totals and counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.items = defaultdict(int)
+        self.counters = defaultdict(int)
+        self.started = time.time()
+        self.torch_profiling = False
+
+    def record(self, stage, elapsed_ns, items=1):
+        """Add one timed run of a stage that processed `items` things"""
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = LatencyHistogram()
+            histogram.record(elapsed_ns)
+            self.items[stage] += items
+
+    @contextmanager
+    def timer(self, stage, items=1):
+        """Time a block as one run of a stage (also labelled in a torch.profiler trace while profiling)"""
+        label = nullcontext()
+        if self.torch_profiling:
+            from torch.profiler import record_function
+
+            label = record_function(stage)
+        start = time.perf_counter_ns()
+        try:
+            with label:
+                yield
+        finally:
+            self.record(stage, time.perf_counter_ns() - start, items)
+
+    def count(self, name, n=1):
+        """Bump a counter"""
+        with self._lock:
+            self.counters[name] += n
+
+    def snapshot(self):
+        """JSON-serializable copy of every stage and counter"""
+        with self._lock:
+            stages = {}
+            for stage in sorted(self.histograms, key=_stage_order):
+                summary = self.histograms[stage].to_dict()
+                summary['items'] = self.items[stage]
+                total_sec = summary['total_ms'] / 1e3
+                summary['items_per_sec'] = summary['items'] / total_sec if total_sec else 0.0
+                stages[stage] = summary
+            return {
+                'timestamp': datetime.now().isoformat(),
+                'uptime_sec': time.time() - self.started,
+                'stages': stages,
+                'counters': dict(self.counters),
+            }
+
+    def reset(self):
+        """Drop everything recorded so far"""
+        with self._lock:
+            self.histograms.clear()
+            self.items.clear()
+            self.counters.clear()
+            self.started = time.time()
+
+
+def _stage_order(stage):
+    return (STAGES.index(stage), stage) if stage in STAGES else (len(STAGES), stage)
+
+
+# Process-wide registry used by the fetcher, engines and pipeline
+metrics = StageMetrics()
+
+
+def stage(name, items=1):
+    """Context manager timing one run of a pipeline stage"""
+    if not ENABLED:
+        return nullcontext()
+    return metrics.timer(name, items)
+
+
+def count(name, n=1):
+    """Bump a process-wide counter"""
+    if ENABLED:
+        metrics.count(name, n)
+
+
+def record(name, elapsed_ns, items=1):
+    """Add an already measured stage duration"""
+    if ENABLED:
+        metrics.record(name, elapsed_ns, items)
+
+
+def snapshot():
+    """Snapshot of the process-wide registry"""
+    return metrics.snapshot()
+
+
+def reset():
+    """Clear the process-wide registry"""
+    metrics.reset()
+
+
+def export_snapshot(path, data=None):
+    """Write a snapshot (the current one by default) as JSON"""
+    data = data or snapshot()
+    with open(path, 'w') as handle:
+        json.dump(data, handle, indent=2)
+    return path
+
+
+def print_snapshot(data=None):
+    """Where the time went: one line per stage, then the counters"""
+    data = data or snapshot()
+    if not data['stages'] and not data['counters']:
+        return
+    grand_total = sum(summary['total_ms'] for summary in data['stages'].values()) or 1.0
+    print("\n--- Stage Timings ---")
+    print(f"{'Stage':<18} {'Runs':>7} {'Items':>8} {'Total':>10} {'Share':>7} {'p50':>9} {'p99':>9} {'Max':>9}")
+    for name, summary in data['stages'].items():
+        print(f"{name:<18} {summary['count']:>7} {summary['items']:>8} {summary['total_ms'] / 1e3:>9.2f}s "
+              f"{summary['total_ms'] / grand_total * 100:>6.1f}% {summary['p50_ms']:>7.2f}ms "
+              f"{summary['p99_ms']:>7.2f}ms {summary['max_ms']:>7.1f}ms")
+    if data['counters']:
+        print(", ".join(f"{name}: {value}" for name, value in sorted(data['counters'].items())))
+
+
+@contextmanager
+def profile(path=None, torch_trace=None, top=25):
+    """cProfile a block (stats to `path`, top functions printed); optionally also a torch.profiler trace
+
+    While the torch profiler runs, every stage timer shows up as a labelled range in the trace.
+    """
+    import cProfile
+    import pstats
+
+    torch_profiler = None
+    if torch_trace:
+        import torch
+        from torch.profiler import ProfilerActivity
+
+        activities = [ProfilerActivity.CPU] + ([ProfilerActivity.CUDA] if torch.cuda.is_available() else [])
+        torch_profiler = torch.profiler.profile(activities=activities)
+        torch_profiler.__enter__()
+        metrics.torch_profiling = True
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if torch_profiler is not None:
+            metrics.torch_profiling = False
+            torch_profiler.__exit__(None, None, None)
+            torch_profiler.export_chrome_trace(torch_trace)
+            print(f"\n🔥 torch.profiler trace: {torch_trace} (open in chrome://tracing or Perfetto)")
+        if path:
+            profiler.dump_stats(path)
+            print(f"\n🔬 cProfile stats: {path}")
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(top)
+
+
+def scan_profiler():
+    """profile() as configured by SCAN_PROFILE / SCAN_TORCH_TRACE, a no-op when neither is set"""
+    if not (PROFILE_PATH or TORCH_TRACE_PATH):
+        return nullcontext()
+    return profile(PROFILE_PATH, TORCH_TRACE_PATH)
+
+
+def report():
+    """Print the current snapshot and export it to STAGE_METRICS_FILE if set"""
+    data = snapshot()
+    print_snapshot(data)
+    if EXPORT_PATH:
+        print(f"📈 Stage metrics: {export_snapshot(EXPORT_PATH, data)}")
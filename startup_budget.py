@@ -0,0 +1,117 @@
+"""
+Startup Budget Check
+Measures cold-start import time per entry point with `python -X importtime`
+and fails if an entry point goes over its budget or pulls in a heavy backend
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from datetime import datetime
+
+# Cold-start budget per entry point, in milliseconds of cumulative import time
+BUDGETS_MS = {
+    'sentiment_analysis': 400,
+    'quick_compare': 400,
+    'monitor_performance': 400,
+}
+
+# Engine backends that must only be imported once an engine is selected
+HEAVY_MODULES = ('torch', 'transformers', 'textblob', 'vaderSentiment', 'bs4', 'feedparser')
+
+_importtime_line = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def measure_import(module, repeats=3):
+    """Best-of-N import of module in a fresh interpreter"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    best = None
+
+    for _ in range(repeats):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=root, capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+
+        # importtime prints children before their parent, two spaces deeper per level
+        children = {}
+        direct_imports = {}
+        heavy = set()
+        total_us = 0
+        for line in completed.stderr.splitlines():
+            match = _importtime_line.match(line)
+            if not match:
+                continue
+            _, cumulative_us, indent, name = match.groups()
+            if name.split('.')[0] in HEAVY_MODULES:
+                heavy.add(name.split('.')[0])
+            if len(indent) == 2:
+                children[name] = int(cumulative_us)
+            elif not indent:
+                if name == module:
+                    total_us = int(cumulative_us)
+                    direct_imports = children
+                children = {}
+
+        if best is None or total_us < best['total_ms'] * 1000:
+            heaviest = sorted(direct_imports.items(), key=lambda item: item[1], reverse=True)[:5]
+            best = {
+                'module': module,
+                'total_ms': total_us / 1000,
+                'heaviest_imports_ms': {name: us / 1000 for name, us in heaviest},
+                'heavy_modules': sorted(heavy),
+            }
+
+    return best
+
+
+def main():
+    """Measure every entry point and compare against its budget"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=3, help="fresh interpreters per entry point")
+    parser.add_argument("--record", help="append results as one JSON line to this file")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("Startup Budget Check (python -X importtime)")
+    print("=" * 70)
+    print(f"{'Entry point':<24} {'Import':<12} {'Budget':<12} {'Status'}")
+    print("-" * 70)
+
+    results = []
+    failed = False
+    for module, budget_ms in BUDGETS_MS.items():
+        result = measure_import(module, args.repeats)
+        result['budget_ms'] = budget_ms
+        result['ok'] = result['total_ms'] <= budget_ms and not result['heavy_modules']
+        failed |= not result['ok']
+        results.append(result)
+
+        status = "✅" if result['ok'] else "❌"
+        print(f"{module:<24} {result['total_ms']:>8.1f}ms {budget_ms:>9}ms   {status}")
+        if result['heavy_modules']:
+            print(f"   ⚠️  imports heavy backends at startup: {', '.join(result['heavy_modules'])}")
+        for name, ms in result['heaviest_imports_ms'].items():
+            print(f"   └─ {name:<19} {ms:>8.1f}ms")
+
+    if args.record:
+        record = {
+            'timestamp': datetime.now().isoformat(),
+            'python': sys.version.split()[0],
+            'results': results,
+        }
+        with open(args.record, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"\n📊 Results appended to: {args.record}")
+
+    print("=" * 70)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,22 @@
-import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import time
 import numpy as np
+import torch
 
 print("="*60)
 print("FinBERT GPU Test")
 print("="*60)
 
-# GPU setup
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-print(f"\n🚀 Device: {device}")
-
 if torch.cuda.is_available():
-    print(f"   GPU: {torch.cuda.get_device_name(0)}")
     print(f"   Initial VRAM: {torch.cuda.memory_allocated() / 1e9:.2f} GB")
 
-# Load model
+# Load model (shared through the model registry)
 print("\n📦 Loading FinBERT model...")
-finbert_model = AutoModelForSequenceClassification.from_pretrained(
-    "yiyanghkust/finbert-tone"
-).to(device)
-finbert_tokenizer = AutoTokenizer.from_pretrained("yiyanghkust/finbert-tone")
-labels = ['Positive', 'Negative', 'Neutral']
+from model_registry import get_device
+from sentiment_engines import get_engine
+from sentiment_analysis import analyze_sentiments
+from benchmark_suite import measure_ns
 
+get_engine('finbert').warm_up()
+print(f"\n🚀 Device: {get_device()}")
 if torch.cuda.is_available():
     print(f"   After loading: {torch.cuda.memory_allocated() / 1e9:.2f} GB")
 
@@ -39,39 +33,25 @@ print(f"\n🧪 Testing with {len(test_sentences)} sentences...")
 print("   (Watch nvidia-smi in another window - GPU should spike!)\n")
 
 # Warm up GPU
-inputs = finbert_tokenizer("warmup", return_tensors="pt", truncation=True, max_length=512).to(device)
-with torch.no_grad():
-    _ = finbert_model(**inputs)
-
-# Benchmark
-start_time = time.time()
-
-for i, text in enumerate(test_sentences):
-    inputs = finbert_tokenizer(
-        text,
-        return_tensors="pt",
-        truncation=True,
-        max_length=512
-    ).to(device)
-
-    with torch.no_grad():
-        outputs = finbert_model(**inputs)
-
-    logits = outputs.logits
-    probabilities = torch.softmax(logits, dim=1).cpu().numpy()[0]
-    max_index = np.argmax(probabilities)
-    sentiment = labels[max_index]
-    confidence = probabilities[max_index]
-
-    if i < 5:  # Print first 5
-        print(f"   [{i+1}] {sentiment} ({confidence:.2f}): {text[:50]}...")
+analyze_sentiments(["warmup"], engine='finbert', use_cache=False)
 
-elapsed = time.time() - start_time
+results = analyze_sentiments(test_sentences, engine='finbert', use_cache=False)
+for i, (text, (confidence, sentiment)) in enumerate(zip(test_sentences[:5], results)):
+    print(f"   [{i+1}] {sentiment} ({confidence:.2f}): {text[:50]}...")
 
+# Benchmark across batch sizes (batch size 1 is the old per-sentence path)
 print(f"\n⏱️  Performance:")
-print(f"   Total time: {elapsed:.2f} seconds")
-print(f"   Per sentence: {(elapsed/len(test_sentences))*1000:.1f} ms")
-print(f"   Throughput: {len(test_sentences)/elapsed:.1f} sentences/sec")
+print(f"   {'Batch':<8} {'p50 total':<12} {'p95 total':<12} {'Per sentence':<16} {'Throughput'}")
+for batch_size in [1, 8, 32]:
+    samples = measure_ns(
+        lambda: analyze_sentiments(test_sentences, engine='finbert', batch_size=batch_size, use_cache=False),
+        warmup=1, repeats=5
+    ) / 1e9
+    elapsed, p95 = np.percentile(samples, [50, 95])
+
+    per_sentence_str = f"{(elapsed/len(test_sentences))*1000:.1f}ms"
+    print(f"   {batch_size:<8} {f'{elapsed:.3f}s':<12} {f'{p95:.3f}s':<12} {per_sentence_str:<16} "
+          f"{len(test_sentences)/elapsed:.1f} sentences/sec")
 
 if torch.cuda.is_available():
     print(f"\n💾 Peak VRAM: {torch.cuda.max_memory_allocated() / 1e9:.2f} GB")